@@ -0,0 +1,75 @@
+"""Per-participant agents.
+
+An Agent is created for every AI participant in setup_game and holds what doesn't
+change during a game: the filled-in system prompt, the personality and the seed sent
+to the model. It also keeps the agent's generation stats.
+"""
+import zlib
+
+def build_system_prompt(template, participant, participants, total_participants, max_names=None):
+    """Fill in a system prompt template for one participant
+
+    With max_names, only that many of the others are named (the ones seated after the
+    participant) and the rest are counted, so the prompt doesn't grow with the room.
+    """
+    others = [p.name for p in participants if p.id != participant.id]
+    if max_names is not None and len(others) > max_names:
+        seat = [p.id for p in participants].index(participant.id)
+        others = others[seat:] + others[:seat]
+        others = others[:max_names] + [f"and {len(others) - max_names} others"]
+    return template.format(
+        name=participant.name,
+        total=total_participants,
+        others=', '.join(others),
+        personality=f"{participant.personality} " if participant.personality else "",
+    )
+
+def stable_seed(*parts):
+    """Return a model seed derived from the parts that is the same in every process, unlike hash()"""
+    return zlib.crc32(":".join(str(part) for part in parts).encode("utf-8")) & 0x7fffffff
+
+class Agent:
+    __slots__ = ("participant", "system_prompt", "seed", "sticky_key",
+                 "generations", "cancelled", "errors", "generation_time", "response_chars")
+
+    def __init__(self, participant, system_prompt, seed, sticky_key=None):
+        self.participant = participant
+        self.system_prompt = system_prompt
+        self.seed = seed
+        self.sticky_key = sticky_key  # Keeps the agent on the server caching its prompt
+
+        self.generations = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.generation_time = 0.0
+        self.response_chars = 0
+
+    @property
+    def personality(self):
+        return self.participant.personality
+
+    def prompt(self, prompt):
+        """Return the full prompt for a request"""
+        return f"{self.system_prompt}\n\n{prompt}"
+
+    def options(self, options, attempt=0):
+        """Add the agent's seed to the generation options of a phase; regenerations get their own seed"""
+        options["seed"] = self.seed + attempt
+        return options
+
+    def record(self, message, seconds):
+        self.generations += 1
+        self.generation_time += seconds
+        self.response_chars += len(message)
+
+    def stats(self):
+        return {
+            "personality": self.personality,
+            "seed": self.seed,
+            "generations": self.generations,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "generation_time": round(self.generation_time, 2),
+            "average_generation_time": round(self.generation_time / self.generations, 2) if self.generations else None,
+            "response_chars": self.response_chars,
+        }
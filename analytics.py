@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Outcome statistics over exported games (see export.py).
+
+Everything works on whole columns with NumPy: detection, suspicion and tie rates per
+group of games, the share of AI ballots that pointed at the human, vote confusion
+matrices by role, and bootstrap confidence intervals. For rates the bootstrap draws
+binomial counts directly, which is the same distribution as resampling the games one
+by one; ratios like the vote share resample games with multinomial weights.
+"""
+import argparse
+import numpy as np
+from colorama import Fore, Style, init
+
+from config import *
+from export import load_tables
+
+# Initialize colorama
+init()
+
+ROLES = ("AI", "human")
+
+def rate_interval(flags, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE_LEVEL, rng=None):
+    """Return (rate, low, high) for an array of booleans"""
+    rng = rng or np.random.default_rng()
+    n = len(flags)
+    if n == 0:
+        return np.nan, np.nan, np.nan
+    rate = np.count_nonzero(flags) / n
+    resampled = rng.binomial(n, rate, samples) / n
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(resampled, [tail, 100 - tail])
+    return rate, low, high
+
+def ratio_interval(numerators, denominators, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE_LEVEL, rng=None,
+                   chunk=1000):
+    """Return (ratio, low, high) for sum(numerators) / sum(denominators), resampling per game"""
+    rng = rng or np.random.default_rng()
+    n = len(numerators)
+    if n == 0 or denominators.sum() == 0:
+        return np.nan, np.nan, np.nan
+    ratio = numerators.sum() / denominators.sum()
+    resampled = []
+    for start in range(0, samples, chunk):
+        weights = rng.multinomial(n, np.full(n, 1 / n), size=min(chunk, samples - start))
+        resampled.append((weights @ numerators) / np.maximum(weights @ denominators, 1))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(np.concatenate(resampled), [tail, 100 - tail])
+    return ratio, low, high
+
+def vote_confusion(votes, games=None):
+    """Count ballots by the voter's role (rows) and the voted participant's role (columns)
+
+    With a boolean mask over the games, only ballots from those games are counted.
+    """
+    mask = np.ones(len(votes["game"]), dtype=bool) if games is None else games[votes["game"]]
+    matrix = np.zeros((2, 2), dtype=np.int64)
+    np.add.at(matrix, (votes["voter_is_human"][mask].astype(int), votes["voted_is_human"][mask].astype(int)), 1)
+    return matrix
+
+def ai_ballots_per_game(votes, game_count):
+    """Return per game the number of AI ballots and how many of those named the human"""
+    ai = ~votes["voter_is_human"]
+    ballots = np.bincount(votes["game"][ai], minlength=game_count)
+    on_human = np.bincount(votes["game"][ai & votes["voted_is_human"]], minlength=game_count)
+    return on_human, ballots
+
+def summarize(tables, by=None, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE_LEVEL, seed=None):
+    """Return a list of per-group statistics; with by=None all games form one group"""
+    rng = np.random.default_rng(seed)
+    games, votes, messages = tables["games"], tables["votes"], tables["messages"]
+    game_count = len(games["source"])
+    on_human, ai_ballots = ai_ballots_per_game(votes, game_count)
+
+    if by is None:
+        labels, groups = np.array(["all games"]), np.zeros(game_count, dtype=np.int64)
+    else:
+        labels, groups = np.unique(games[by], return_inverse=True)
+
+    # Average message length by role, for every group at once
+    message_group = groups[messages["game"]]
+    role = messages["sender_is_human"].astype(int)
+    lengths = np.zeros((len(labels), 2))
+    counts = np.zeros((len(labels), 2))
+    np.add.at(lengths, (message_group, role), messages["length"])
+    np.add.at(counts, (message_group, role), 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        average_lengths = lengths / counts
+
+    summary = []
+    for index, label in enumerate(labels):
+        mask = groups == index
+        summary.append({
+            "group": str(label) or f"no {by}",
+            "games": int(mask.sum()),
+            "detection": rate_interval(games["detected"][mask], samples, confidence, rng),
+            "suspicion": rate_interval(games["suspected"][mask], samples, confidence, rng),
+            "ties": rate_interval(games["tie"][mask], samples, confidence, rng),
+            "human_vote_share": ratio_interval(on_human[mask], ai_ballots[mask], samples, confidence, rng),
+            "confusion": vote_confusion(votes, mask),
+            "message_length": {ROLES[r]: average_lengths[index, r] for r in range(2)},
+        })
+    return summary
+
+def interval(values):
+    rate, low, high = values
+    if np.isnan(rate):
+        return "-"
+    return f"{rate:.1%} [{low:.1%}, {high:.1%}]"
+
+def print_summary(summary, confidence):
+    print(f"\n{Fore.CYAN}=== GAME ANALYTICS ({confidence:.0%} bootstrap intervals) ==={Style.RESET_ALL}")
+    for stats in summary:
+        print(f"\n{Fore.CYAN}{stats['group']}{Style.RESET_ALL}: {stats['games']} games")
+        print(f"  detected:          {interval(stats['detection'])}")
+        print(f"  suspected:         {interval(stats['suspicion'])}")
+        print(f"  ties:              {interval(stats['ties'])}")
+        print(f"  AI votes on human: {interval(stats['human_vote_share'])}")
+        lengths = ", ".join(f"{role} {length:.0f}" for role, length in stats["message_length"].items() if not np.isnan(length))
+        if lengths:
+            print(f"  message length:    {lengths} characters")
+        matrix = stats["confusion"]
+        print(f"  ballots (voter -> voted):  {'AI':>6} {'human':>6}")
+        for row, role in enumerate(ROLES):
+            print(f"    {role:<24} {matrix[row, 0]:>6} {matrix[row, 1]:>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute outcome statistics over exported games.")
+    parser.add_argument("path", nargs="?", default=EXPORT_FILE, help=".npz file or Parquet directory written by export.py")
+    parser.add_argument("--by", choices=["model", "config", "participants"], help="group the games by this column")
+    parser.add_argument("--samples", type=int, default=BOOTSTRAP_SAMPLES, help="bootstrap resamples")
+    parser.add_argument("--confidence", type=float, default=CONFIDENCE_LEVEL)
+    parser.add_argument("--seed", type=int, help="seed for reproducible intervals")
+    args = parser.parse_args()
+
+    tables = load_tables(args.path)
+    if not len(tables["games"].get("source", [])):
+        print(f"{Fore.RED}No games in {args.path}{Style.RESET_ALL}")
+        return
+    print_summary(summarize(tables, args.by, args.samples, args.confidence, args.seed), args.confidence)
+
+if __name__ == "__main__":
+    main()
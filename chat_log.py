@@ -0,0 +1,90 @@
+"""Compact chat history shared by the CLI and GUI games.
+
+Messages are stored column-wise in typed arrays, so each one costs a few bytes on top
+of its text, and the log is the single owner of that text. Timestamps are monotonic
+and only turned into clock strings when a message is rendered.
+"""
+import time
+from array import array
+from datetime import datetime
+
+def estimate_tokens(text):
+    """Rough token count, about four characters per token"""
+    return max(1, (len(text) + 3) // 4)
+
+class ChatMessage:
+    """Read-only view of one message in a ChatLog"""
+    __slots__ = ("index", "participant_index", "created", "text", "token_count")
+
+    def __init__(self, index, participant_index, created, text, token_count):
+        self.index = index
+        self.participant_index = participant_index
+        self.created = created
+        self.text = text
+        self.token_count = token_count
+
+class ChatLog:
+    def __init__(self):
+        self.participant_indices = array("H")
+        self.created = array("d")
+        self.token_counts = array("I")
+        self.texts = []
+
+        # Anchor monotonic timestamps to the wall clock once, for rendering
+        self.wall_start = time.time()
+        self.monotonic_start = time.monotonic()
+
+    def append(self, participant_index, text):
+        """Add a message and return its index in the log"""
+        self.participant_indices.append(participant_index)
+        self.created.append(time.monotonic())
+        self.token_counts.append(estimate_tokens(text))
+        self.texts.append(text)
+        return len(self.texts) - 1
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.texts)
+        if not 0 <= index < len(self.texts):
+            raise IndexError("chat log index out of range")
+        return ChatMessage(index, self.participant_indices[index], self.created[index],
+                           self.texts[index], self.token_counts[index])
+
+    def __iter__(self):
+        return self.tail(len(self.texts))
+
+    def tail(self, count):
+        """Iterate over the last count messages"""
+        for index in range(max(0, len(self.texts) - count), len(self.texts)):
+            yield self[index]
+
+    def last(self):
+        """Return the most recent message, or None if the log is empty"""
+        return self[-1] if self.texts else None
+
+    def format_time(self, created, fmt="%H:%M:%S"):
+        """Render a monotonic timestamp as a wall-clock string"""
+        return datetime.fromtimestamp(self.wall_start + created - self.monotonic_start).strftime(fmt)
+
+    def to_state(self):
+        """Return the log as plain data, with wall-clock timestamps so it can move between processes"""
+        offset = self.wall_start - self.monotonic_start
+        return {
+            "participant_indices": self.participant_indices.tolist(),
+            "created": [round(created + offset, 3) for created in self.created],
+            "texts": list(self.texts),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a log saved with to_state"""
+        log = cls()
+        offset = log.wall_start - log.monotonic_start
+        log.participant_indices.extend(state["participant_indices"])
+        log.created.extend(created - offset for created in state["created"])
+        log.token_counts.extend(estimate_tokens(text) for text in state["texts"])
+        log.texts = list(state["texts"])
+        return log
@@ -3,6 +3,34 @@
 # Ollama API settings
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 MODEL_NAME = "gemma3:12b"
+FAST_MODEL_NAME = "gemma3:4b"  # Smaller model for phases that don't need the big one
+OLLAMA_API_URLS = [OLLAMA_API_URL]  # Add more servers to spread participants over several inference boxes
+ENDPOINT_HEALTH_CHECK_INTERVAL = 30  # Seconds before an endpoint that went down is checked again
+
+# Model and generation options per game phase (see model_routing.py).
+# A phase without a model uses MODEL_NAME; options are passed to Ollama as-is. Add
+# "model": FAST_MODEL_NAME to intro, question and vote to run them on the smaller model.
+PHASE_MODELS = {
+    "intro": {"options": {"num_ctx": 2048, "temperature": 0.9}},
+    "chat": {"options": {"num_ctx": 4096, "temperature": 0.8}},
+    "question": {"options": {"num_ctx": 4096, "temperature": 0.8}},
+    "answer": {"options": {"num_ctx": 4096, "temperature": 0.8}},
+    "vote": {"options": {"num_ctx": 8192, "temperature": 0.2}},
+}
+
+# Latency SLO (see slo.py): when the average of the last SLO_WINDOW generations is
+# slower than the target, settings step down one level; they step back up once the
+# average is below SLO_RECOVERY_RATIO times the target. A fallback model that isn't
+# installed is skipped, like any routed model other than MODEL_NAME
+SLO_ENABLED = True
+SLO_TARGET_SECONDS = 8.0
+SLO_WINDOW = 5
+SLO_RECOVERY_RATIO = 0.5
+SLO_LEVELS = [
+    {"num_ctx": 4096, "num_predict": 120},
+    {"num_ctx": 2048, "num_predict": 80},
+    {"model": FAST_MODEL_NAME, "num_ctx": 2048, "num_predict": 80},
+]
 
 # Game settings
 NUM_AI_PARTICIPANTS = 4  # Number of AI participants
@@ -12,9 +40,114 @@ MAX_TURNS = 50  # Maximum number of turns (as a fallback if time-based ending do
 # AI behavior settings
 MIN_RESPONSE_DELAY = 1.5  # Minimum delay between AI responses (seconds)
 MAX_RESPONSE_DELAY = 3.5  # Maximum delay between AI responses (seconds)
-DIRECT_QUESTION_FREQUENCY = 3  # How often AIs ask direct questions (every N turns)
+DIRECT_QUESTION_FREQUENCY = 3  # AIs ask a direct question when nobody was named in the last N messages
 MAX_AI_RESPONSE_LENGTH = 150  # Maximum length of AI responses in characters
 
+# Reply validation (see validation.py): errors, empty replies and lines written for other
+# participants are kept out of the chat history. A reply that can't be repaired is generated
+# again up to REPLY_RETRIES times; after that a fallback reply for the phase is used instead
+REPLY_RETRIES = 1
+FALLBACK_REPLIES = {
+    "intro": ["Hi everyone, I'm {name}. Nice to meet you all."],
+    "chat": ["Hmm, I'm not sure what to make of that.", "Interesting. What does everyone else think?", "Fair point."],
+    "question": ["What do you make of the conversation so far?"],
+    "answer": ["Good question, I'd have to think about that one.", "Honestly, I'm not sure."],
+    "vote": ["I'm not sure."],
+}
+
+# Turn scheduling (see scheduler.py): whoever was just named speaks next, and AIs with
+# nothing new to react to pass without calling the model
+SCHEDULER_MENTION_WINDOW = 3  # Recent messages in which being named gives a participant the next turn
+SCHEDULER_MAX_ANSWER_STREAK = 3  # Answers in a row before the rotation takes over again
+SCHEDULER_MIN_NEW_MESSAGES = 2  # An AI that wasn't named passes until this many messages came in since it last spoke
+
+# Pacing per phase: a reply should take about as long as typing it would (see pacing.py).
+# Generation time counts towards that target, so slow generations get no extra delay.
+PACING = {
+    "intro": {"chars_per_second": 12, "min_delay": MIN_RESPONSE_DELAY, "max_delay": MAX_RESPONSE_DELAY},
+    "chat": {"chars_per_second": 12, "min_delay": MIN_RESPONSE_DELAY, "max_delay": MAX_RESPONSE_DELAY},
+    "question": {"chars_per_second": 12, "min_delay": MIN_RESPONSE_DELAY, "max_delay": MAX_RESPONSE_DELAY},
+    "answer": {"chars_per_second": 12, "min_delay": 1.0, "max_delay": MAX_RESPONSE_DELAY},
+    "vote": {"chars_per_second": 40, "min_delay": 1.0, "max_delay": 2.0},
+}
+
+# System prompt variants; {name}, {total}, {others} and {personality} are filled in per participant
+PROMPT_VARIANTS = {
+    "default": (
+        "You are {name} in a group chat with {total} participants. "
+        "The other participants are: {others}. "
+        "You are an AI assistant based on Llama 3.1. {personality}"
+        "Keep your responses VERY concise (1-2 short sentences). "
+        "Your responses should be under 150 characters whenever possible. "
+        "You can ask questions to other participants by addressing them by their name. "
+        "You are trying to determine which participant is a human pretending to be an AI. "
+        "Be conversational but brief in your responses."
+    ),
+    "suspicious": (
+        "You are {name}, one of {total} participants in a group chat with {others}. "
+        "You are an AI, and exactly one of the others is a human pretending to be an AI. {personality}"
+        "Probe for human tells like personal anecdotes, typos or emotional reactions. "
+        "Reply in 1-2 short sentences, under 150 characters, and address people by name."
+    ),
+}
+
+# Prompt compaction (see prompt_compaction.py): chat history without timestamps, short
+# speaker tags when they help, and the system prompts below, which give each instruction once
+PROMPT_COMPACTION = True
+COMPACT_PROMPT_VARIANTS = {
+    "default": (
+        "You are {name} in a group chat with {total} participants: {others}. "
+        "You are an AI assistant based on Llama 3.1. {personality}"
+        "Find out which participant is a human pretending to be an AI; ask others questions by name. "
+        "Reply conversationally in 1-2 short sentences, under 150 characters."
+    ),
+    "suspicious": (
+        "You are {name}, one of {total} participants in a group chat with {others}. "
+        "You are an AI; exactly one of the others is a human pretending to be an AI. {personality}"
+        "Probe for human tells (personal anecdotes, typos, emotions). "
+        "Reply in 1-2 short sentences, under 150 characters, addressing people by name."
+    ),
+}
+
+# Personality traits given to the AI participants (used by the GUI and by tournaments)
+PERSONALITY_TRAITS = [
+    "You are analytical and logical in your responses.",
+    "You are friendly and empathetic in your communication style.",
+    "You are curious and inquisitive, often asking thoughtful questions.",
+    "You are straightforward and concise in your messages.",
+    "You are slightly humorous but still professional."
+]
+
+# Retrieval of relevant older messages for AI prompts (see retrieval.py)
+RETRIEVAL_ENABLED = True  # Prompt with recent plus relevant older messages instead of a fixed window
+OLLAMA_EMBEDDINGS_URL = "http://localhost:11434/api/embeddings"
+EMBEDDING_MODEL = "nomic-embed-text"  # Falls back to hashed embeddings if not available
+MOCK_EMBEDDING_DIMENSIONS = 256  # Size of the fallback hashed embeddings
+RECENT_MESSAGES = 10  # Most recent messages always included in a prompt
+RETRIEVED_MESSAGES = 4  # Older messages added to a prompt by relevance
+
+# Suspicion scoring (see suspicion.py)
+SUSPICION_VOTE_SUMMARY = True  # AIs vote on a short summary per participant instead of the whole chat
+SUSPICION_QUOTE_CHARS = 80  # Length of the latest message quoted for each participant
+
+# Realtime CLI settings
+REALTIME_CLI = False  # Let the AIs keep chatting while you type (same as --realtime)
+HUMAN_REPLY_WINDOW = 20  # Seconds the AIs wait for you after addressing you in realtime mode
+
+# Checkpoints (see game_state.py)
+CHECKPOINT_FILE = "game_checkpoint.json"  # Default file for --checkpoint
+CHECKPOINT_INTERVAL = 15  # Seconds between checkpoints of a running game
+
+# Startup (see startup.py)
+PREFLIGHT_TIMEOUT = 5  # Seconds to wait for the Ollama server during the startup check
+STARTUP_REPORT = False  # Print how long each startup step took (same as --startup-report)
+
+# Web server settings (see web_server.py)
+WEB_HOST = "0.0.0.0"
+WEB_PORT = 3000
+WEB_MAX_CONCURRENT_REQUESTS = 4  # Requests in flight to the inference server across all rooms
+WEB_EMBEDDING_WORKERS = 2  # Threads embedding new messages, separate from the generation requests
+
 # Display settings
 SHOW_TIMESTAMPS = True  # Whether to show timestamps in the chat
 DEBUG_MODE = False  # Enable debug mode for additional logging
@@ -26,4 +159,27 @@ PARTICIPANT_NAMES = [
     "Finley", "Gray", "Harper", "Indigo", "Jordan",
     "Kai", "Logan", "Morgan", "Nico", "Parker",
     "Quinn", "Riley", "Sage", "Taylor", "Val"
-] 
\ No newline at end of file
+]
+
+# Large rooms (see rooms.py): with more participants than LARGE_ROOM_THRESHOLD, names and
+# colors are generated as needed, only a few AIs speak per round and prompt sizes are capped
+LARGE_ROOM_THRESHOLD = 6  # Total participants, including the human
+LARGE_ROOM_SPEAKERS_PER_ROUND = 3  # AIs that speak in each round
+LARGE_ROOM_LISTED_NAMES = 8  # Other participants named in an AI's system prompt
+LARGE_ROOM_PROMPT_MESSAGES = 30  # Most recent messages in prompts that would otherwise get the whole chat
+
+# Tournament settings (see tournament.py)
+TOURNAMENT_MODELS = [MODEL_NAME]  # Models to evaluate
+TOURNAMENT_AI_PARTICIPANTS = [NUM_AI_PARTICIPANTS]  # Room sizes to evaluate
+TOURNAMENT_PERSONALITY_SETS = ["none", "mixed"]  # Personality sets to evaluate
+TOURNAMENT_PROMPT_VARIANTS = ["default"]  # Keys of PROMPT_VARIANTS to evaluate
+TOURNAMENT_GAMES_PER_CONFIG = 20  # Games played for every configuration
+TOURNAMENT_MAX_TURNS = 20  # Turn limit for tournament games
+TOURNAMENT_WORKERS = 4  # Number of worker processes
+TOURNAMENT_MAX_CONCURRENT_REQUESTS = 2  # Requests in flight to the inference server across all workers
+TOURNAMENT_RESULTS_FILE = "tournament_results.jsonl"  # Finished games are appended here
+
+# Export and analytics settings (see export.py and analytics.py)
+EXPORT_FILE = "games.npz"  # Default output of export.py
+BOOTSTRAP_SAMPLES = 10000  # Resamples for the confidence intervals in analytics.py
+CONFIDENCE_LEVEL = 0.95
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Export finished games to columnar tables for analysis.
+
+Reads JSON and text game transcripts and tournament result files and writes three
+tables: one row per game, per message and per ballot. Tables are saved in a single
+NumPy .npz file, or as Parquet files when pyarrow is installed. Short strings are stored
+as fixed-width unicode columns; message texts have no length limit, so the .npz keeps
+them as one UTF-8 buffer plus offsets instead of padding every row to the longest
+message. Either way the .npz loads without pickle. analytics.py reads both formats.
+"""
+import argparse
+import glob
+import json
+import os
+import numpy as np
+from colorama import Fore, Style, init
+
+from config import *
+from transcripts import load_transcript
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Initialize colorama
+init()
+
+TABLES = ("games", "messages", "votes")
+STRING_COLUMNS = {"source", "model", "config", "date"}
+TEXT_COLUMNS = {"text"}  # Free text of any length, see save_npz
+BOOL_COLUMNS = {"detected", "suspected", "tie", "sender_is_human", "voter_is_human", "voted_is_human"}
+
+def column_type(column):
+    if column in TEXT_COLUMNS:
+        return object
+    if column in STRING_COLUMNS:
+        return str
+    return bool if column in BOOL_COLUMNS else np.int32
+
+class TableBuilder:
+    """Collects rows as Python lists and turns them into NumPy columns"""
+    def __init__(self):
+        self.games = {name: [] for name in ("source", "model", "config", "date", "human", "participants",
+                                              "messages", "turns", "detected", "suspected", "tie", "human_votes")}
+        self.messages = {name: [] for name in ("game", "seq", "sender", "sender_is_human", "length", "text")}
+        self.votes = {name: [] for name in ("game", "voter", "voted", "voter_is_human", "voted_is_human")}
+
+    def add_game(self, source, participants, human, model="", config="", date="", chat_history=(), ballots=(),
+                 turns=-1, votes=None):
+        """Add one game; participants is a list of names in seat order"""
+        game = len(self.games["source"])
+        seats = {name: seat for seat, name in enumerate(participants)}
+        votes = votes or {}
+        if ballots and not votes:
+            for ballot in ballots:
+                votes[ballot["voted"]] = votes.get(ballot["voted"], 0) + 1
+
+        # Work out the outcome from the vote counts, as compute_results does
+        most = max(votes.values(), default=0)
+        most_voted = [name for name in participants if votes.get(name, 0) == most]
+        self.games["source"].append(source)
+        self.games["model"].append(model or "")
+        self.games["config"].append(config)
+        self.games["date"].append(date or "")
+        self.games["human"].append(seats.get(human, -1))
+        self.games["participants"].append(len(participants))
+        self.games["messages"].append(len(chat_history))
+        self.games["turns"].append(turns)
+        self.games["detected"].append(most_voted == [human])
+        self.games["suspected"].append(human in most_voted)
+        self.games["tie"].append(len(most_voted) > 1)
+        self.games["human_votes"].append(votes.get(human, 0))
+
+        for seq, message in enumerate(chat_history):
+            sender = seats.get(message["sender"], -1)
+            self.messages["game"].append(game)
+            self.messages["seq"].append(seq)
+            self.messages["sender"].append(sender)
+            self.messages["sender_is_human"].append(message["sender"] == human)
+            self.messages["length"].append(len(message["message"]))
+            self.messages["text"].append(message["message"])
+
+        for ballot in ballots:
+            self.votes["game"].append(game)
+            self.votes["voter"].append(seats.get(ballot["voter"], -1))
+            self.votes["voted"].append(seats.get(ballot["voted"], -1))
+            self.votes["voter_is_human"].append(ballot["voter"] == human)
+            self.votes["voted_is_human"].append(ballot["voted"] == human)
+
+    def add_transcript(self, filename):
+        transcript = load_transcript(filename)
+        self.add_game(
+            os.path.basename(filename),
+            [p["name"] for p in transcript["participants"]],
+            transcript["human"],
+            model=transcript.get("model"),
+            date=transcript.get("date"),
+            chat_history=transcript["chat_history"],
+            ballots=transcript.get("ballots", []),
+            votes={p["name"]: p.get("votes", 0) for p in transcript["participants"]},
+        )
+
+    def add_tournament(self, filename):
+        """Add the finished games of a tournament results file"""
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line
+                if "error" in record:
+                    continue
+                results = record["results"]
+                self.add_game(
+                    f"{os.path.basename(filename)}:{record['key']}:{record['game_index']}",
+                    results["participants"],
+                    results["human"],
+                    model=record["config"].get("model"),
+                    config=record["key"],
+                    ballots=results["ballots"],
+                    turns=results["turns"],
+                    votes=dict(results["votes"]),
+                )
+                # Tournament records only count the messages
+                self.games["messages"][-1] = results["messages"]
+
+    def tables(self):
+        """Return {table: {column: array}}"""
+        return {name: {column: np.array(values, dtype=column_type(column)) for column, values in getattr(self, name).items()}
+                for name in TABLES}
+
+def save_npz(tables, filename):
+    arrays = {}
+    for table, columns in tables.items():
+        for column, values in columns.items():
+            if column in TEXT_COLUMNS:
+                # Row i is data[offsets[i]:offsets[i + 1]]
+                encoded = [value.encode("utf-8") for value in values]
+                arrays[f"{table}.{column}.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+                arrays[f"{table}.{column}.offsets"] = np.cumsum([0] + [len(value) for value in encoded], dtype=np.int64)
+            else:
+                arrays[f"{table}.{column}"] = values
+    np.savez_compressed(filename, **arrays)
+
+def save_parquet(tables, directory):
+    os.makedirs(directory, exist_ok=True)
+    for table, columns in tables.items():
+        arrow_table = pyarrow.table({column: values.tolist() for column, values in columns.items()})
+        pyarrow.parquet.write_table(arrow_table, os.path.join(directory, f"{table}.parquet"))
+
+def load_tables(path):
+    """Load tables written by export.py from a .npz file or a directory of Parquet files"""
+    if os.path.isdir(path):
+        if pyarrow is None:
+            raise ImportError("Reading Parquet files needs pyarrow (pip install pyarrow)")
+        tables = {}
+        for table in TABLES:
+            arrow_table = pyarrow.parquet.read_table(os.path.join(path, f"{table}.parquet"))
+            tables[table] = {column: arrow_table.column(column).to_numpy() for column in arrow_table.column_names}
+        return tables
+
+    tables = {table: {} for table in TABLES}
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            table, column = key.split(".", 1)
+            if column.endswith(".offsets"):
+                continue
+            if column.endswith(".data"):
+                column = column[:-len(".data")]
+                buffer = data[key].tobytes()
+                offsets = data[f"{table}.{column}.offsets"]
+                tables[table][column] = np.array([buffer[start:end].decode("utf-8")
+                                                  for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+            else:
+                tables[table][column] = data[key]
+    return tables
+
+def main():
+    parser = argparse.ArgumentParser(description="Export games to columnar tables.")
+    parser.add_argument("inputs", nargs="+", help="transcript files, tournament .jsonl files or glob patterns")
+    parser.add_argument("--output", default=EXPORT_FILE, help="output .npz file, or directory for Parquet")
+    parser.add_argument("--format", choices=["npz", "parquet"], default="npz")
+    args = parser.parse_args()
+
+    if args.format == "parquet" and pyarrow is None:
+        parser.error("Parquet output needs pyarrow (pip install pyarrow)")
+
+    filenames = []
+    for pattern in args.inputs:
+        filenames.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    # A game saved as both text and JSON is only counted once, from the JSON
+    json_stems = {os.path.splitext(f)[0] for f in filenames if f.endswith(".json")}
+    builder = TableBuilder()
+    for filename in filenames:
+        try:
+            if filename.endswith(".jsonl"):
+                builder.add_tournament(filename)
+            elif filename.endswith(".json") or os.path.splitext(filename)[0] not in json_stems:
+                builder.add_transcript(filename)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{Fore.RED}Skipping {filename}: {str(e)}{Style.RESET_ALL}")
+
+    tables = builder.tables()
+    if args.format == "parquet":
+        save_parquet(tables, args.output)
+    else:
+        save_npz(tables, args.output)
+    counts = ", ".join(f"{len(next(iter(columns.values())))} {table}" for table, columns in tables.items())
+    print(f"{Fore.GREEN}Exported {counts} to {args.output}{Style.RESET_ALL}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""The game flow shared by the window and web front ends.
+
+ReverseGameGUI and the web server's WebGame play the same game: the scheduler picks a
+turn, an AI turn is one generation, a question names its target, who answers it next,
+and the votes and the result are worked out the same way. GameFlow holds those steps as
+blocking methods. The front ends decide where they run (a thread, or the web server's
+thread pool) and how their results are shown.
+"""
+import time
+
+from config import *
+from agents import Agent, build_system_prompt, stable_seed
+from retrieval import select_context
+from scheduler import Turn
+from reverse_turing_test import VOTE_INSTRUCTION, find_vote
+
+TURN_PROMPTS = {
+    "intro": "Introduce yourself briefly to the group. Don't reveal that you're an AI.",
+    "chat": "Continue the conversation naturally.",
+    "answer": "Respond to the previous question directed at you. Keep your response brief and natural.",
+}
+
+def turn_prompt(turn):
+    """Return the instruction for an AI turn"""
+    if turn.target is not None:
+        return (
+            f"Ask a direct question to {turn.target.name} that might help reveal "
+            f"whether they are a human pretending to be an AI. Make your question challenging but natural and VERY brief."
+        )
+    return TURN_PROMPTS[turn.phase]
+
+def vote_message(voted_participant, vote_response):
+    return f"I vote that {voted_participant.name} is the human because: {vote_response}"
+
+class GameFlow:
+    """Mixin for the GUI and web games
+
+    The game sets game_id, participants, human_participant, agents, chat_history,
+    history_index, ballots, turn_counter, game_over, speakers, scheduler, validator,
+    router, pacer, client, rng, chat_token and vote_token.
+    """
+    def create_agents(self):
+        # Prompt and seed stay the same for the whole game, so they are worked out once
+        max_names = LARGE_ROOM_LISTED_NAMES if self.speakers else None
+        for participant in self.participants:
+            if not participant.is_human:
+                self.agents[participant.id] = Agent(
+                    participant,
+                    build_system_prompt(PROMPT_VARIANTS["default"], participant, self.participants,
+                                        len(self.participants), max_names),
+                    seed=stable_seed(self.game_id, participant.id),  # Its own seed in every game, the same after a resume
+                    sticky_key=f"{self.game_id}:{participant.id}",
+                )
+
+    def add_to_history(self, participant, message):
+        """Add a message to the chat history and return its index; the front end embeds it"""
+        index = self.chat_history.append(participant.id - 1, message)
+        participant.messages.append(index)
+        return index
+
+    def format_chat_history(self, for_participant):
+        # Show the most recent messages, plus the most relevant older ones if retrieval is enabled
+        if RETRIEVAL_ENABLED:
+            query = " ".join(entry.text for entry in self.chat_history.tail(3)) + f" {for_participant.name}"
+            retrieved, recent = select_context(self.chat_history, self.history_index, query, for_participant.name)
+        else:
+            retrieved, recent = [], [entry.index for entry in self.chat_history.tail(RECENT_MESSAGES)]
+
+        formatted = ""
+        for index in retrieved:
+            entry = self.chat_history[index]
+            formatted += f"{self.participants[entry.participant_index].name}: {entry.text}\n"
+        if retrieved:
+            formatted += "...\n"
+        for index in recent:
+            entry = self.chat_history[index]
+            formatted += f"{self.participants[entry.participant_index].name}: {entry.text}\n"
+        return formatted
+
+    def generate_ai_message(self, participant, prompt, phase="chat", cancel_token=None):
+        """Generate a message, returning None if the generation was cancelled
+
+        Replies that fail validation are generated again up to REPLY_RETRIES times and
+        then replaced by a fallback.
+        """
+        agent = self.agents[participant.id]
+        chat_history = self.format_chat_history(participant)
+        full_prompt = agent.prompt(f"Chat history:\n{chat_history}\n\n{prompt}")
+
+        def request(attempt):
+            # Make API request to Ollama with the model and options routed for this phase
+            model, options = self.router.route(phase)
+            options.setdefault("num_ctx", 2048)  # Ensure enough context
+            started = time.monotonic()
+            message = self.client.generate(
+                model,
+                full_prompt,
+                options=agent.options(options, attempt),
+                cancel_token=cancel_token or self.chat_token,
+                sticky_key=agent.sticky_key
+            ).strip()
+            generation_time = time.monotonic() - started
+            self.router.record(phase, generation_time)
+            agent.record(message, generation_time)
+            return message
+
+        return self.validator.generate(agent, phase, request)
+
+    def next_turn(self):
+        self.turn_counter += 1
+        return self.scheduler.next_turn()
+
+    def generate_turn(self, turn):
+        """Generate the message of an AI turn; return it with the typing delay still to wait, or None"""
+        started = time.monotonic()
+        message = self.generate_ai_message(turn.speaker, turn_prompt(turn), turn.phase)
+        if message is None:
+            return None
+        # Make sure a question includes the target's name
+        if turn.target is not None and turn.target.name not in message:
+            message = f"{turn.target.name}, {message}"
+        return message, self.pacer.delay(turn.phase, message, time.monotonic() - started)
+
+    def follow_up(self, turn):
+        """The target of a question answers it right away; other turns go back to the scheduler (None)"""
+        return Turn(turn.target, "answer") if turn.target is not None else None
+
+    def close_chat(self):
+        """End the discussion and return the AIs that still have to vote"""
+        self.game_over = True
+        self.chat_token.cancel()
+        # AIs that voted before the game was restored don't vote again
+        voted = {voter for voter, _ in self.ballots}
+        return [p for p in self.participants if not p.is_human and p.id not in voted]
+
+    def cast_vote(self, voting_participant):
+        """Generate and count an AI's vote; return (voted participant, response), or None if cancelled"""
+        vote_response = self.generate_ai_message(voting_participant, VOTE_INSTRUCTION, "vote", cancel_token=self.vote_token)
+        if vote_response is None:
+            return None
+
+        # If no valid name found, choose randomly (but not self)
+        voted_participant = find_vote(vote_response, voting_participant, self.participants)
+        if voted_participant is None:
+            voted_participant = self.rng.choice([p for p in self.participants if p.id != voting_participant.id])
+        voted_participant.votes += 1
+        self.ballots.append((voting_participant.id, voted_participant.id))
+        return voted_participant, vote_response
+
+    def results(self):
+        """Return the participants sorted by votes and the message telling the human how it went"""
+        sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
+        most_votes = sorted_participants[0].votes
+        most_voted = [p for p in sorted_participants if p.votes == most_votes]
+        if self.human_participant in most_voted:
+            if len(most_voted) == 1:
+                result_message = "You were identified as the human! The AI models successfully detected you."
+            else:
+                result_message = "There was a tie in the voting. You were among those suspected to be human."
+        else:
+            result_message = "Success! You weren't identified as the human! You successfully convinced the AI models that you're an AI."
+        return sorted_participants, result_message
+
+    def shutdown(self):
+        """Stop the game and abort every generation still in flight"""
+        self.game_over = True
+        if self.chat_token is not None:
+            self.chat_token.cancel()
+        self.vote_token.cancel()
@@ -0,0 +1,84 @@
+"""Serializable game state for checkpoints and moving games between processes.
+
+A snapshot is plain JSON data holding everything needed to continue a game
+elsewhere: participants, chat history, ballots, the turn counter, the time left in
+the chat, the RNG state, the per-agent state and where the turn order stands.
+Checkpoints are written atomically, so a crash while writing never leaves a broken
+file behind.
+"""
+import json
+import os
+
+STATE_VERSION = 1
+
+def encode_rng_state(state):
+    """Turn random.Random.getstate() into JSON-friendly lists"""
+    version, internal_state, gauss_next = state
+    return [version, list(internal_state), gauss_next]
+
+def decode_rng_state(data):
+    version, internal_state, gauss_next = data
+    return version, tuple(internal_state), gauss_next
+
+def participant_state(participant):
+    return {
+        "id": participant.id,
+        "is_human": participant.is_human,
+        "name": participant.name,
+        "personality": participant.personality,
+        "votes": participant.votes,
+    }
+
+def restore_participant(participant, state):
+    participant.name = state["name"]
+    participant.personality = state["personality"]
+    participant.votes = state["votes"]
+
+def agent_state(agent):
+    return {
+        "seed": agent.seed,
+        "generations": agent.generations,
+        "cancelled": agent.cancelled,
+        "errors": agent.errors,
+        "generation_time": agent.generation_time,
+        "response_chars": agent.response_chars,
+    }
+
+def restore_agent(agent, state):
+    # Only the fields agent_state saves; older checkpoints may hold fields since dropped
+    for key in agent_state(agent):
+        if key in state:
+            setattr(agent, key, state[key])
+
+def scheduler_state(scheduler):
+    state = {
+        "position": scheduler.position,
+        "answer_streak": scheduler.answer_streak,
+        "skipped": scheduler.skipped,
+    }
+    if scheduler.speakers is not None:
+        state["round"] = [participant.id for participant in scheduler.speakers.round]
+    return state
+
+def restore_scheduler(scheduler, state):
+    """Continue the turn order where it was; participants must be restored first"""
+    scheduler.position = state["position"]
+    scheduler.answer_streak = state["answer_streak"]
+    scheduler.skipped = state["skipped"]
+    if scheduler.speakers is not None:
+        by_id = {participant.id: participant for participant in scheduler.participants}
+        scheduler.speakers.round = [by_id[participant_id] for participant_id in state.get("round", [])]
+
+def write_checkpoint(filename, state):
+    """Write a snapshot, replacing the previous checkpoint only once it is complete"""
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(temp_filename, filename)
+
+def read_checkpoint(filename):
+    with open(filename, encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+    return state
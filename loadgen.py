@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Find out how many simultaneous games one process and one inference box can sustain.
+
+Each step of the ramp plays N concurrent headless games, one thread each, with
+scripted humans. The games run against a mock Ollama server (see mock_ollama.py),
+which runs in its own process with configurable latency and concurrency, so the tool
+works fully offline. Point --url at a real server to measure that instead.
+
+For every step it reports throughput, generation latency percentiles, queueing
+delay (at the server and at the optional client-side request limit) and traced
+memory per session.
+"""
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from colorama import Fore, Style, init
+
+from config import *
+from ollama_client import OllamaClient
+from retrieval import EmbeddingClient
+from reverse_turing_test import ReverseGame
+
+# Initialize colorama
+init()
+
+def percentile(values, p):
+    """Return the p-th percentile (0-100) of a list of numbers, or None if it is empty"""
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+class RecordingClient(OllamaClient):
+    """Ollama client that records the latency of every generation"""
+    def __init__(self, latencies, lock, **kwargs):
+        super().__init__(**kwargs)
+        self.latencies = latencies
+        self.lock = lock
+
+    def generate(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().generate(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.latencies.append(time.perf_counter() - started)
+
+class TimedLimiter:
+    """Client-side request limit that records how long requests wait for a slot"""
+    def __init__(self, limit, waits, lock):
+        self.semaphore = threading.BoundedSemaphore(limit)
+        self.waits = waits
+        self.lock = lock
+
+    def acquire(self):
+        started = time.perf_counter()
+        self.semaphore.acquire()
+        with self.lock:
+            self.waits.append(time.perf_counter() - started)
+
+    def release(self):
+        self.semaphore.release()
+
+def serve_mock(connection, first_token_latency, tokens_per_second, max_concurrency):
+    """Run the mock server in a child process and send its URL back"""
+    from mock_ollama import MockOllama
+    mock = MockOllama(first_token_latency=first_token_latency, tokens_per_second=tokens_per_second,
+                      max_concurrency=max_concurrency)
+    connection.send(mock.url)
+    mock.server.serve_forever()
+
+def run_step(args, base_url, sessions):
+    """Play one batch of concurrent games and return its measurements"""
+    lock = threading.Lock()
+    latencies = []
+    limiter_waits = []
+    limiter = TimedLimiter(args.max_requests, limiter_waits, lock) if args.max_requests else None
+    if args.mock:
+        requests.post(f"{base_url}/mock/reset", timeout=5)
+
+    def play(session):
+        game = ReverseGame(
+            headless=True,
+            max_turns=args.max_turns,
+            chat_duration_minutes=args.duration,
+            pacing=args.pacing,
+            request_limiter=limiter,
+            save_transcript=False,
+            seed=session,
+            adaptive_latency=False,
+            client=RecordingClient(latencies, lock, api_url=f"{base_url}/api/generate"),
+            embedder=EmbeddingClient(api_url=f"{base_url}/api/embeddings"),
+        )
+        return game.run_game()
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    results, errors = [], []
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        for future in [executor.submit(play, session) for session in range(sessions)]:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+    wall = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    server = requests.get(f"{base_url}/mock/stats", timeout=5).json() if args.mock else {}
+    turns = sum(result["turns"] for result in results)
+    return {
+        "sessions": sessions,
+        "games": len(results),
+        "errors": len(errors),
+        "error_messages": errors[:5],
+        "wall": wall,
+        "generations": len(latencies),
+        "generations_per_second": len(latencies) / wall,
+        "turns_per_second": turns / wall,
+        "tokens_per_second": server.get("tokens", 0) / wall,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p99": percentile(latencies, 99),
+        "server_queue_p50": percentile(server.get("queue_waits", []), 50),
+        "server_queue_p99": percentile(server.get("queue_waits", []), 99),
+        "limiter_wait_p99": percentile(limiter_waits, 99),
+        "max_in_flight": server.get("max_in_flight"),
+        "memory_per_session_kb": peak_memory / sessions / 1024,
+    }
+
+def seconds(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+def print_report(steps, target):
+    print(f"\n{Fore.CYAN}=== LOAD TEST RESULTS ==={Style.RESET_ALL}")
+    print(f"{'sessions':>8} {'games':>6} {'errors':>6} {'gen/s':>7} {'turns/s':>8} {'tok/s':>7} "
+          f"{'p50 s':>7} {'p90 s':>7} {'p99 s':>7} {'queue p50':>10} {'queue p99':>10} {'limit p99':>10} {'KB/session':>11}")
+    for step in steps:
+        color = Fore.RED if step["errors"] or (step["latency_p90"] or 0) > target else ""
+        print(
+            f"{color}{step['sessions']:>8} {step['games']:>6} {step['errors']:>6} {step['generations_per_second']:>7.2f} "
+            f"{step['turns_per_second']:>8.2f} {step['tokens_per_second']:>7.1f} {seconds(step['latency_p50']):>7} "
+            f"{seconds(step['latency_p90']):>7} {seconds(step['latency_p99']):>7} {seconds(step['server_queue_p50']):>10} "
+            f"{seconds(step['server_queue_p99']):>10} {seconds(step['limiter_wait_p99']):>10} "
+            f"{step['memory_per_session_kb']:>11.0f}{Style.RESET_ALL}"
+        )
+
+    sustained = [step["sessions"] for step in steps if not step["errors"] and (step["latency_p90"] or 0) <= target]
+    if sustained:
+        print(f"\n{Fore.GREEN}Up to {max(sustained)} concurrent sessions kept p90 latency within {target:.1f}s.{Style.RESET_ALL}")
+    else:
+        print(f"\n{Fore.RED}No step kept p90 latency within {target:.1f}s.{Style.RESET_ALL}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp up concurrent headless games and measure how they scale.")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4, 8, 16], help="concurrent games per ramp step")
+    parser.add_argument("--max-turns", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=2, help="chat duration in minutes")
+    parser.add_argument("--pacing", action="store_true", help="wait the typing delays like a real game")
+    parser.add_argument("--max-requests", type=int, default=0, help="client-side cap on concurrent requests (0 for none)")
+    parser.add_argument("--target", type=float, default=SLO_TARGET_SECONDS, help="p90 generation latency target in seconds")
+    parser.add_argument("--url", help="measure a real Ollama server at this base URL instead of the mock")
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="mock: seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0, help="mock: generation speed per request")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="mock: requests served at once, the rest queue")
+    parser.add_argument("--output", help="also write the measurements to this JSON file")
+    args = parser.parse_args()
+    args.mock = args.url is None
+
+    mock_process = None
+    if args.mock:
+        parent, child = multiprocessing.Pipe()
+        mock_process = multiprocessing.Process(
+            target=serve_mock,
+            args=(child, args.first_token_latency, args.tokens_per_second, args.max_concurrency),
+            daemon=True,
+        )
+        mock_process.start()
+        base_url = parent.recv()
+        print(f"{Fore.CYAN}Mock server at {base_url}: {args.first_token_latency}s to first token, "
+              f"{args.tokens_per_second} tokens/s, {args.max_concurrency} concurrent requests{Style.RESET_ALL}")
+    else:
+        base_url = args.url.rstrip("/")
+
+    steps = []
+    try:
+        for sessions in args.sessions:
+            print(f"Running {sessions} concurrent sessions...")
+            step = run_step(args, base_url, sessions)
+            steps.append(step)
+            for message in step["error_messages"]:
+                print(f"{Fore.RED}  {message}{Style.RESET_ALL}")
+    finally:
+        if mock_process is not None:
+            mock_process.terminate()
+
+    print_report(steps, args.target)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(steps, f, indent=2)
+
+if __name__ == "__main__":
+    main()
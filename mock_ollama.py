@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Ollama API, for load tests and offline development.
+
+Serves /api/tags, /api/generate (streaming and not) and /api/embeddings. Replies are
+canned chat lines that mention other participants, so games and votes play out
+normally. Latency is modelled as a fixed time to the first token plus prompt
+processing and token generation at configurable rates. At most max_concurrency
+requests are served at once and the rest queue, like the parallel slots of a real
+inference server. /mock/stats reports request counts and queueing delay and
+/mock/reset clears them.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from retrieval import EmbeddingClient
+
+OTHERS = re.compile(r"(?:other participants are|group chat with \d+ participants): ([^.]*)\.|participants in a group chat with ([^.]*)\.")
+
+REPLIES = [
+    "{name}, that's an interesting point. What made you think of it?",
+    "I agree with {name}. Let's keep the conversation moving.",
+    "Honestly I process things much like {name} does, quickly and logically.",
+    "{name}, how would you describe your training data?",
+    "That answer from {name} felt a little too personal for an AI.",
+    "I think {name} is the human. The replies are oddly emotional.",
+    "Good question. I'd say efficiency matters most to me, {name}.",
+]
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is normal under load
+        pass
+
+class MockOllama:
+    def __init__(self, host="127.0.0.1", port=0, first_token_latency=0.2, tokens_per_second=30.0,
+                 prompt_tokens_per_second=2000.0, max_concurrency=1, models=None, seed=None):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.max_concurrency = max_concurrency
+        self.models = models or ["gemma3:12b", "gemma3:4b", "nomic-embed-text"]
+        self.rng = random.Random(seed)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.embedder = EmbeddingClient()
+        self.lock = threading.Lock()
+        self.reset()
+
+        self.server = QuietServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.completed = 0
+            self.cancelled = 0
+            self.tokens = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.queue_waits = []
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "tokens": self.tokens,
+                "max_in_flight": self.max_in_flight,
+                "queue_waits": list(self.queue_waits),
+            }
+
+    def reply(self, prompt):
+        """Pick a canned reply addressed to one of the other participants in the prompt"""
+        match = OTHERS.search(prompt)
+        names = [n.strip() for n in (match.group(1) or match.group(2)).split(",")] if match else []
+        names = [n for n in names if not n.startswith("and ")] or ["everyone"]
+        with self.lock:
+            template = self.rng.choice(REPLIES)
+            name = self.rng.choice(names)
+        return template.format(name=name)
+
+    def generate(self, handler, body):
+        prompt = body.get("prompt", "")
+        text = self.reply(prompt)
+        words = text.split(" ")
+
+        queued = time.perf_counter()
+        with self.slots:
+            with self.lock:
+                self.requests += 1
+                self.queue_waits.append(time.perf_counter() - queued)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                prompt_tokens = len(prompt) // 4
+                time.sleep(self.first_token_latency + prompt_tokens / self.prompt_tokens_per_second)
+                if not body.get("stream", True):
+                    time.sleep(len(words) / self.tokens_per_second)
+                    handler.send_json({"model": body.get("model"), "response": text, "done": True,
+                                       "prompt_eval_count": prompt_tokens, "eval_count": len(words)})
+                else:
+                    handler.send_response(200)
+                    handler.send_header("Content-Type", "application/x-ndjson")
+                    handler.send_header("Transfer-Encoding", "chunked")
+                    handler.end_headers()
+                    for i, word in enumerate(words):
+                        handler.send_chunk({"model": body.get("model"), "response": word if i == 0 else " " + word, "done": False})
+                        time.sleep(1 / self.tokens_per_second)
+                    handler.send_chunk({"model": body.get("model"), "response": "", "done": True,
+                                        "prompt_eval_count": prompt_tokens, "eval_count": len(words)})
+                    handler.wfile.write(b"0\r\n\r\n")
+                with self.lock:
+                    self.completed += 1
+                    self.tokens += len(words)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client cancelled the generation
+                with self.lock:
+                    self.cancelled += 1
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, data, status=200):
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_chunk(self, data):
+                line = (json.dumps(data) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self.send_json({"models": [{"name": name} for name in mock.models]})
+                elif self.path == "/mock/stats":
+                    self.send_json(mock.stats())
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    mock.generate(self, body)
+                elif self.path == "/api/embeddings":
+                    self.send_json({"embedding": list(mock.embedder.mock_embed(body.get("prompt", "")))})
+                elif self.path == "/mock/reset":
+                    mock.reset()
+                    self.send_json({})
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0, help="generation speed per request")
+    parser.add_argument("--max-concurrency", type=int, default=1, help="requests served at once; the rest queue")
+    args = parser.parse_args()
+
+    mock = MockOllama(args.host, args.port, args.first_token_latency, args.tokens_per_second,
+                      max_concurrency=args.max_concurrency)
+    print(f"Mock Ollama server listening on {mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
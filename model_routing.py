@@ -0,0 +1,29 @@
+"""Per-phase model routing.
+
+Each phase of the game (intro, chat, question, answer, vote) can use its own model and
+generation options, so phases that don't need the big model don't spend GPU time on it.
+Models the servers don't have are marked unavailable after the startup check, and their
+phases fall back to the main model.
+"""
+from config import *
+
+class ModelRouter:
+    def __init__(self, main_model=MODEL_NAME, phase_models=None):
+        self.main_model = main_model
+        self.phase_models = PHASE_MODELS if phase_models is None else phase_models
+        self.unavailable = set()  # Models not installed on the servers, replaced by the main model
+
+    def route(self, phase):
+        """Return the model and a fresh copy of the options to use for a phase"""
+        entry = self.phase_models.get(phase, {})
+        model = self.available(entry.get("model") or self.main_model)
+        options = dict(entry.get("options", {}))
+        return model, options
+
+    def available(self, model):
+        """Return the model, or the main model if the servers don't have it"""
+        return self.main_model if model in self.unavailable else model
+
+    def models(self):
+        """Return every model this router can send requests to"""
+        return {self.main_model} | {entry.get("model") or self.main_model for entry in self.phase_models.values()}
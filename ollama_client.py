@@ -0,0 +1,250 @@
+"""Client for the Ollama generate API with cancellable, deadline-aware requests.
+
+Generations are streamed, so a request can be aborted at any point by closing the
+response. Closing the connection makes Ollama stop generating, which frees the
+inference server right away instead of finishing a message nobody will see.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from config import *
+
+logger = logging.getLogger(__name__)
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is aborted because its game ended or was closed"""
+
+class GenerationError(Exception):
+    """Raised when the Ollama API answers with an error status"""
+    def __init__(self, status_code):
+        super().__init__(f"Ollama API returned status {status_code}")
+        self.status_code = status_code
+
+class CancelToken:
+    """Cancels the generations registered with it when cancelled or when its deadline passes"""
+    def __init__(self, deadline=None):
+        self.event = threading.Event()
+        self.deadline = deadline
+        self.lock = threading.Lock()
+        self.responses = set()
+        self.timer = None
+        if deadline is not None:
+            self.timer = threading.Timer(max(0, deadline - time.time()), self.cancel)
+            self.timer.daemon = True
+            self.timer.start()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set() or (self.deadline is not None and time.time() >= self.deadline)
+
+    def remaining(self):
+        """Seconds left until the deadline, or None if there is no deadline"""
+        if self.deadline is None:
+            return None
+        return max(0, self.deadline - time.time())
+
+    def cancel(self):
+        """Abort every generation still in flight for this token"""
+        self.event.set()
+        if self.timer is not None:
+            self.timer.cancel()
+        with self.lock:
+            responses = list(self.responses)
+        for response in responses:
+            response.close()
+
+    def register(self, response):
+        with self.lock:
+            self.responses.add(response)
+        # The token may have been cancelled while the request was being sent
+        if self.cancelled:
+            response.close()
+
+    def unregister(self, response):
+        with self.lock:
+            self.responses.discard(response)
+
+class Endpoint:
+    """One Ollama server in an EndpointPool"""
+    def __init__(self, url):
+        self.url = url
+        self.tags_url = url.rsplit("/api/", 1)[0] + "/api/tags"
+        self.outstanding = 0
+        self.assigned = 0  # Sticky keys currently routed here
+        self.healthy = True
+        self.last_check = 0
+
+    def __repr__(self):
+        return f"Endpoint({self.url!r}, outstanding={self.outstanding}, healthy={self.healthy})"
+
+class EndpointPool:
+    """Routes generations over several Ollama servers
+
+    New participants go to the healthy endpoint with the fewest requests in flight and
+    then stay on it, so their prompt prefix is still in that server's KV cache on the
+    next turn. An endpoint that fails to connect is marked down, its participants move
+    to other endpoints, and it is health-checked again in the background after
+    health_check_interval.
+    """
+    MAX_ASSIGNMENTS = 10000  # Sticky assignments remembered, oldest are forgotten first
+
+    def __init__(self, urls=None, health_check_interval=ENDPOINT_HEALTH_CHECK_INTERVAL):
+        self.endpoints = [Endpoint(url) for url in (urls or OLLAMA_API_URLS)]
+        self.health_check_interval = health_check_interval
+        self.assignments = OrderedDict()  # Sticky key -> endpoint
+        self.lock = threading.Lock()
+
+    def check(self, endpoint):
+        """Probe an endpoint and record whether it is up"""
+        import requests
+        try:
+            healthy = requests.get(endpoint.tags_url, timeout=2).status_code == 200
+        except requests.exceptions.RequestException:
+            healthy = False
+        with self.lock:
+            if endpoint.healthy != healthy:
+                logger.warning("Endpoint %s is %s", endpoint.url, "back up" if healthy else "down")
+            endpoint.healthy = healthy
+            endpoint.last_check = time.time()
+        return healthy
+
+    def acquire(self, sticky_key=None, exclude=()):
+        """Pick an endpoint for a request and count it as outstanding, or None if all were excluded"""
+        with self.lock:
+            # Give endpoints that were down a new chance once their check interval has passed. The
+            # probe runs in the background, and only the request that claims it here starts it
+            now = time.time()
+            for endpoint in self.endpoints:
+                if not endpoint.healthy and now - endpoint.last_check >= self.health_check_interval:
+                    endpoint.last_check = now
+                    threading.Thread(target=self.check, args=(endpoint,), daemon=True).start()
+
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            # If every endpoint is down, still try one rather than failing outright
+            candidates = [e for e in candidates if e.healthy] or candidates
+
+            previous = self.assignments.get(sticky_key) if sticky_key is not None else None
+            endpoint = previous
+            if endpoint not in candidates:
+                # Ties go to the endpoint with the fewest participants, so new ones spread out
+                endpoint = min(candidates, key=lambda e: (e.outstanding, e.assigned))
+                if sticky_key is not None:
+                    if previous is not None:
+                        previous.assigned -= 1
+                    self.assignments[sticky_key] = endpoint
+                    endpoint.assigned += 1
+                    if len(self.assignments) > self.MAX_ASSIGNMENTS:
+                        _, forgotten = self.assignments.popitem(last=False)
+                        forgotten.assigned -= 1
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, failed=False):
+        with self.lock:
+            endpoint.outstanding -= 1
+            if failed:
+                if endpoint.healthy:
+                    logger.warning("Endpoint %s is down", endpoint.url)
+                endpoint.healthy = False
+                endpoint.last_check = time.time()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def default_pool():
+    """Endpoint pool shared by every game in this process"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EndpointPool()
+        return _default_pool
+
+class OllamaClient:
+    def __init__(self, api_url=None, pool=None, connect_timeout=5):
+        if api_url is not None:
+            pool = EndpointPool([api_url])
+        self.pool = pool or default_pool()
+        self.connect_timeout = connect_timeout
+
+    def generate(self, model, prompt, options=None, cancel_token=None, sticky_key=None):
+        """Stream a completion and return its text, raising GenerationCancelled if aborted
+
+        Requests with the same sticky_key (one per participant) go to the same endpoint
+        while it is up. If an endpoint can't be reached the request fails over to the next.
+        """
+        import requests  # Deferred so importing this module stays fast (see startup.py)
+        tried = set()
+        last_error = None
+        while True:
+            endpoint = self.pool.acquire(sticky_key, exclude=tried)
+            if endpoint is None:
+                raise last_error
+            failed = False
+            try:
+                return self._generate(endpoint.url, model, prompt, options, cancel_token)
+            except requests.exceptions.ConnectionError as e:
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise GenerationCancelled()
+                failed = True
+                last_error = e
+                tried.add(endpoint)
+            finally:
+                self.pool.release(endpoint, failed)
+
+    def _generate(self, api_url, model, prompt, options, cancel_token):
+        import requests
+        if cancel_token is not None and cancel_token.cancelled:
+            raise GenerationCancelled()
+
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+
+        # Never wait for a byte longer than the time left in the game
+        read_timeout = cancel_token.remaining() if cancel_token is not None else None
+        if read_timeout is not None:
+            read_timeout = max(read_timeout, 0.1)
+
+        try:
+            response = requests.post(
+                api_url,
+                json=payload,
+                stream=True,
+                timeout=(self.connect_timeout, read_timeout),
+            )
+        except requests.exceptions.ReadTimeout:
+            if cancel_token is not None and cancel_token.cancelled:
+                raise GenerationCancelled()
+            raise
+
+        if cancel_token is not None:
+            cancel_token.register(response)
+        try:
+            if response.status_code != 200:
+                raise GenerationError(response.status_code)
+
+            parts = []
+            for line in response.iter_lines():
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise GenerationCancelled()
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    break
+            return "".join(parts)
+        except (requests.exceptions.RequestException, OSError, AttributeError, ValueError):
+            # Closing the response from another thread surfaces as a read error here
+            if cancel_token is not None and cancel_token.cancelled:
+                raise GenerationCancelled()
+            raise
+        finally:
+            if cancel_token is not None:
+                cancel_token.unregister(response)
+            response.close()
@@ -0,0 +1,36 @@
+"""Latency-aware pacing of AI replies.
+
+Instead of sleeping a fixed random delay after every generation, each reply gets a
+target "typing time" based on its length. The time the model already spent generating
+counts towards that target, so a slow generation is not followed by an extra delay.
+"""
+import random
+import time
+
+from config import *
+
+class Pacer:
+    def __init__(self, phases=None, enabled=True, rng=None):
+        self.phases = phases or PACING
+        self.enabled = enabled
+        self.rng = rng or random.Random()
+
+    def target(self, phase, message):
+        """Return how long a participant would take to type this message"""
+        settings = self.phases[phase]
+        typing_time = len(message or "") / settings["chars_per_second"]
+        typing_time *= self.rng.uniform(0.8, 1.2)  # Some jitter so replies don't arrive like clockwork
+        return min(max(typing_time, settings["min_delay"]), settings["max_delay"])
+
+    def delay(self, phase, message, generation_time):
+        """Return the remaining delay after a generation that took generation_time seconds"""
+        if not self.enabled:
+            return 0
+        return max(0, self.target(phase, message) - generation_time)
+
+    def wait(self, phase, message, generation_time):
+        """Sleep for the remaining delay, if any"""
+        delay = self.delay(phase, message, generation_time)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
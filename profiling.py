@@ -0,0 +1,162 @@
+"""Per-phase profiling of a game.
+
+Phases (setup, introductions, turns, questions, voting, transcript saving, ...) are
+wrapped in PhaseProfiler.phase(). Nested phases are recorded under their parent, so
+"discussion/turn/generate" is model time spent in a discussion turn. For every phase
+the wall time and the CPU time of the calling thread are summed.
+
+Optionally cProfile runs for the whole game, or a sampling profiler records the stack
+of the game thread at a fixed interval. The report is a text summary plus a file of
+collapsed stacks that flame graph tools read directly. When profiling is disabled,
+phase() returns a shared no-op context manager.
+"""
+import io
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+PROFILE_MODES = ("phases", "cprofile", "sample")
+
+_NULL_PHASE = nullcontext()
+
+class PhaseStats:
+    __slots__ = ("calls", "wall", "cpu", "child_wall")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_wall = 0.0  # Wall time spent in nested phases
+
+class PhaseProfiler:
+    def __init__(self, enabled=False, mode="phases", sample_interval=0.005):
+        self.enabled = enabled
+        self.mode = mode if enabled else None
+        self.sample_interval = sample_interval
+        self.phases = {}  # Phase path -> PhaseStats
+        self.stack = []
+        self.thread_id = None
+        self.profile = None
+        self.samples = Counter()  # Collapsed stack -> number of samples
+        self.sampler = None
+        self.stop_event = threading.Event()
+        self.started = None
+        self.wall = 0.0
+
+    def phase(self, name):
+        """Context manager timing a phase of the game"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name):
+        self.stack.append(name)
+        path = "/".join(self.stack)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            stats = self.phases.get(path)
+            if stats is None:
+                stats = self.phases[path] = PhaseStats()
+            stats.calls += 1
+            stats.wall += wall
+            stats.cpu += time.thread_time() - cpu_start
+            self.stack.pop()
+            if self.stack:
+                parent = self.phases.setdefault("/".join(self.stack), PhaseStats())
+                parent.child_wall += wall
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        if self.mode == "cprofile":
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.mode == "sample":
+            self.sampler = threading.Thread(target=self._sample, daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        if not self.enabled or self.started is None:
+            return
+        self.wall = time.perf_counter() - self.started
+        if self.profile is not None:
+            self.profile.disable()
+        if self.sampler is not None:
+            self.stop_event.set()
+            self.sampler.join()
+
+    def _sample(self):
+        while not self.stop_event.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            # The phase stack sits at the root, so the flame graph is split by phase first
+            phases = [f"phase:{name}" for name in list(self.stack)]
+            self.samples[";".join(phases + frames[::-1])] += 1
+
+    def summary(self):
+        """Return the per-phase breakdown as text"""
+        lines = [f"Total wall time: {self.wall:.2f}s", ""]
+        lines.append(f"{'phase':<40} {'calls':>6} {'wall s':>9} {'self s':>9} {'cpu s':>8} {'avg wall ms':>12}")
+        for path in sorted(self.phases):
+            stats = self.phases[path]
+            depth = path.count("/")
+            name = "  " * depth + path.rsplit("/", 1)[-1]
+            average = stats.wall / stats.calls * 1000 if stats.calls else 0.0
+            lines.append(
+                f"{name:<40} {stats.calls:>6} {stats.wall:>9.2f} {stats.wall - stats.child_wall:>9.2f} "
+                f"{stats.cpu:>8.3f} {average:>12.1f}"
+            )
+
+        if self.profile is not None:
+            import pstats
+            output = io.StringIO()
+            pstats.Stats(self.profile, stream=output).sort_stats("cumulative").print_stats(25)
+            lines += ["", output.getvalue()]
+        if self.samples:
+            lines += ["", f"{sum(self.samples.values())} stack samples every {self.sample_interval * 1000:.0f}ms"]
+        return "\n".join(lines)
+
+    def collapsed_stacks(self):
+        """Return lines of "frame;frame;... count" for flame graph tools
+
+        Sampled stacks are weighted by sample count; without sampling the phase tree is
+        written instead, weighted by each phase's own wall time in milliseconds.
+        """
+        if self.samples:
+            return [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+        lines = []
+        for path in sorted(self.phases):
+            stats = self.phases[path]
+            own_ms = round((stats.wall - stats.child_wall) * 1000)
+            if own_ms > 0:
+                lines.append(f"{path.replace('/', ';')} {own_ms}")
+        return lines
+
+    def write(self, prefix):
+        """Write the summary, collapsed stacks and (with cProfile) raw stats; return the file names"""
+        filenames = [f"{prefix}.txt", f"{prefix}.folded"]
+        with open(filenames[0], "w", encoding="utf-8") as f:
+            f.write(self.summary() + "\n")
+        with open(filenames[1], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+        if self.profile is not None:
+            filenames.append(f"{prefix}.prof")
+            self.profile.dump_stats(filenames[-1])
+        return filenames
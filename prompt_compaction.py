@@ -0,0 +1,98 @@
+"""Compact prompt encoding, to cut the tokens the model has to prefill on every turn.
+
+The chat history in a compact prompt has no timestamps and collapsed whitespace, and
+speakers get short tags (with a legend) when that is shorter than their names. The
+system prompt comes from COMPACT_PROMPT_VARIANTS, which state each instruction once,
+or from the regular template with duplicate sentences removed. Every compacted prompt
+is measured against the prompt it replaces, so the saving can be reported per phase.
+"""
+import re
+
+from config import *
+from chat_log import estimate_tokens
+
+WHITESPACE = re.compile(r"\s+")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"[a-z0-9]+")
+
+def collapse(text):
+    return WHITESPACE.sub(" ", text).strip()
+
+def dedupe_sentences(text):
+    """Drop sentences that repeat an earlier one, ignoring case and punctuation"""
+    seen = set()
+    kept = []
+    for sentence in SENTENCE_END.split(collapse(text)):
+        key = " ".join(WORD.findall(sentence.lower()))
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return " ".join(kept)
+
+def compact_template(variant):
+    """Return the compact system prompt template for a prompt variant"""
+    if variant in COMPACT_PROMPT_VARIANTS:
+        return COMPACT_PROMPT_VARIANTS[variant]
+    return dedupe_sentences(PROMPT_VARIANTS[variant])
+
+def speaker_tags(names):
+    """Shortest unique prefix of at least two letters for every name"""
+    tags = {}
+    for name in names:
+        tag = name  # Names that are too short or a prefix of another name keep their full name
+        for length in range(2, len(name)):
+            if not any(other != name and other.startswith(name[:length]) for other in names):
+                tag = name[:length]
+                break
+        tags[name] = tag
+    return tags
+
+class PromptCompactor:
+    def __init__(self, enabled=PROMPT_COMPACTION):
+        self.enabled = enabled
+        self.baseline_system = {}  # Participant id -> tokens of the uncompacted system prompt
+        self.compact_system = {}  # Participant id -> tokens of the system prompt actually sent
+        self.stats = {}  # Phase -> [prompts, original tokens, compact tokens]
+        self.tags = {}  # Speaker tag -> names it has stood for in a prompt
+
+    def add_agent(self, participant_id, original_system_prompt, system_prompt):
+        self.baseline_system[participant_id] = estimate_tokens(original_system_prompt)
+        self.compact_system[participant_id] = estimate_tokens(system_prompt)
+
+    def transcript(self, lines):
+        """Encode (speaker, text) lines compactly; a speaker of None marks skipped messages"""
+        names = sorted({speaker for speaker, _ in lines if speaker is not None})
+        tags = speaker_tags(names)
+        counts = {}
+        for speaker, _ in lines:
+            counts[speaker] = counts.get(speaker, 0) + 1
+        legend = "Speakers: " + ", ".join(f"{tags[name]}={name}" for name in names) + "\n"
+        saved = sum((len(name) - len(tags[name])) * counts[name] for name in names)
+        if saved <= len(legend):
+            tags = {name: name for name in names}
+            legend = ""
+        for name in names:
+            if tags[name] != name:
+                self.tags.setdefault(tags[name], set()).add(name)
+        return legend + "".join("...\n" if speaker is None else f"{tags[speaker]}: {collapse(text)}\n"
+                                for speaker, text in lines)
+
+    def record(self, phase, participant_id, original, compact):
+        """Account for one prompt; original and compact exclude the system prompt"""
+        stats = self.stats.setdefault(phase, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += self.baseline_system.get(participant_id, 0) + estimate_tokens(original)
+        stats[2] += self.compact_system.get(participant_id, 0) + estimate_tokens(compact)
+
+    def report(self):
+        """Return average prompt tokens before and after compaction per phase"""
+        return {
+            phase: {
+                "prompts": prompts,
+                "original_tokens": round(original / prompts),
+                "compact_tokens": round(compact / prompts),
+                "saved": round(1 - compact / original, 3) if original else 0.0,
+            }
+            for phase, (prompts, original, compact) in self.stats.items()
+        }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Replay saved games into the voting prompts of other models.
+
+Every AI participant of a saved game casts its vote again with each of the given
+models, using the prompt ai_vote would build at the end of that game with the current
+settings: the suspicion summary or the chat, compacted if PROMPT_COMPACTION is on.
+Votes run concurrently and are cached on disk, so re-scoring the same transcripts
+against a new model only pays for the new model's votes.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from colorama import Fore, Style, init
+
+from config import *
+from ollama_client import OllamaClient
+from transcripts import load_transcript
+from agents import build_system_prompt
+from rooms import is_large_room
+from suspicion import SuspicionScorer
+from prompt_compaction import PromptCompactor, compact_template
+from reverse_turing_test import Participant, find_vote, vote_prompt
+
+# Initialize colorama
+init()
+
+class VoteCache:
+    """Vote responses keyed by model and prompt, persisted as JSON"""
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.entries = {}
+        if filename and os.path.exists(filename):
+            with open(filename, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(model, prompt):
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, model, prompt):
+        with self.lock:
+            return self.entries.get(self.key(model, prompt))
+
+    def put(self, model, prompt, response):
+        with self.lock:
+            self.entries[self.key(model, prompt)] = response
+
+    def save(self):
+        if not self.filename:
+            return
+        with self.lock:
+            temp_filename = self.filename + ".tmp"
+            with open(temp_filename, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(temp_filename, self.filename)
+
+def rebuild_participants(transcript):
+    """Recreate the participants of a saved game"""
+    participants = []
+    for i, saved in enumerate(transcript["participants"], 1):
+        participant = Participant(i, saved["is_human"])
+        participant.name = saved["name"]
+        participants.append(participant)
+    return participants
+
+def format_saved_history(entries):
+    """Format saved chat messages the way the game formats them for prompting"""
+    formatted = ""
+    for entry in entries:
+        if SHOW_TIMESTAMPS and entry.get("time"):
+            formatted += f"[{entry['time']}] {entry['sender']}: {entry['message']}\n"
+        else:
+            formatted += f"{entry['sender']}: {entry['message']}\n"
+    return formatted
+
+def saved_time(entry):
+    """Seconds since the game started, or from the whole-second wall time in older transcripts"""
+    if "seconds" in entry:
+        return entry["seconds"]
+    try:
+        time = datetime.strptime(entry.get("time") or "", "%H:%M:%S")
+    except ValueError:
+        return None
+    return time.hour * 3600 + time.minute * 60 + time.second
+
+def score_saved_chat(transcript, participants):
+    """Score a saved chat like the game does, with the reply latencies it had"""
+    by_name = {p.name: p for p in participants}
+    suspicion = SuspicionScorer()
+    previous = None
+    for entry in transcript["chat_history"]:
+        time = saved_time(entry)
+        latency = None
+        if time is not None and previous is not None and time >= previous:
+            latency = time - previous
+        previous = time
+        if entry["sender"] in by_name:
+            suspicion.update(by_name[entry["sender"]], entry["message"], latency)
+    return suspicion
+
+def vote_prompts(transcript, prompt_variant):
+    """Yield (voter, participants, full prompt) for every AI participant of a saved game"""
+    participants = rebuild_participants(transcript)
+    large_room = is_large_room(len(participants))
+    max_names = LARGE_ROOM_LISTED_NAMES if large_room else None
+    entries = transcript["chat_history"][-LARGE_ROOM_PROMPT_MESSAGES:] if large_room else transcript["chat_history"]
+    history = format_saved_history(entries)
+    lines = [(entry["sender"], entry["message"]) for entry in entries]
+    suspicion = score_saved_chat(transcript, participants)
+    compactor = PromptCompactor()
+    template = compact_template(prompt_variant) if compactor.enabled else PROMPT_VARIANTS[prompt_variant]
+    for voter in participants:
+        if voter.is_human:
+            continue
+        system_prompt = build_system_prompt(template, voter, participants, len(participants), max_names)
+        prompt = vote_prompt(voter, participants, suspicion, compactor, history, lines, max_names)
+        yield voter, participants, f"{system_prompt}\n\n{prompt}"
+
+def cast_vote(client, cache, model, prompt):
+    """Return a model's vote response for a prompt, from the cache when possible"""
+    response = cache.get(model, prompt)
+    if response is None:
+        response = client.generate(model, prompt).strip()
+        cache.put(model, prompt, response)
+    return response
+
+def score(votes, participants):
+    """Tally the replayed votes of one game and decide whether the human was caught"""
+    tally = {p.name: 0 for p in participants}
+    abstained = 0
+    for voter, response in votes:
+        voted = find_vote(response, voter, participants)
+        if voted is None:
+            abstained += 1
+        else:
+            tally[voted.name] += 1
+
+    human = next(p.name for p in participants if p.is_human)
+    most_votes = max(tally.values())
+    most_voted = [name for name, count in tally.items() if count == most_votes]
+    if most_votes == 0:
+        outcome = "missed"
+    elif most_voted == [human]:
+        outcome = "caught"
+    elif human in most_voted:
+        outcome = "tie"
+    else:
+        outcome = "missed"
+    return {"tally": tally, "abstained": abstained, "outcome": outcome}
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score saved games with the voting prompts of other models.")
+    parser.add_argument("transcripts", nargs="+", help="transcript files (.json or .txt) or glob patterns")
+    parser.add_argument("--models", nargs="+", default=[MODEL_NAME])
+    parser.add_argument("--prompt-variant", choices=sorted(PROMPT_VARIANTS), default="default")
+    parser.add_argument("--workers", type=int, default=4, help="votes generated concurrently")
+    parser.add_argument("--cache", default="replay_cache.json", help="file caching vote responses ('' to disable)")
+    args = parser.parse_args()
+
+    # The game saves each transcript as text and JSON; replay the JSON copy only
+    filenames = {}
+    for pattern in args.transcripts:
+        for filename in glob.glob(pattern) or [pattern]:
+            stem = os.path.splitext(filename)[0]
+            if stem not in filenames or filename.endswith(".json"):
+                filenames[stem] = filename
+    filenames = sorted(filenames.values())
+    client = OllamaClient()
+    cache = VoteCache(args.cache)
+
+    # Submit every vote of every game for every model, then collect them per game
+    games = []
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for filename in filenames:
+            transcript = load_transcript(filename)
+            for model in args.models:
+                futures = []
+                participants = None
+                for voter, participants, prompt in vote_prompts(transcript, args.prompt_variant):
+                    futures.append((voter, executor.submit(cast_vote, client, cache, model, prompt)))
+                games.append((filename, model, participants, futures))
+
+        summary = {model: {"games": 0, "caught": 0, "tie": 0, "missed": 0, "errors": 0} for model in args.models}
+        for filename, model, participants, futures in games:
+            try:
+                votes = [(voter, future.result()) for voter, future in futures]
+            except Exception as e:
+                summary[model]["errors"] += 1
+                print(f"{Fore.RED}{filename} [{model}]: {e}{Style.RESET_ALL}")
+                continue
+
+            result = score(votes, participants)
+            summary[model]["games"] += 1
+            summary[model][result["outcome"]] += 1
+            tally = ", ".join(f"{name} {count}" for name, count in result["tally"].items())
+            print(f"{filename} [{model}]: {result['outcome']} ({tally}; {result['abstained']} abstained)")
+
+    cache.save()
+
+    print(f"\n{Fore.CYAN}=== REPLAY SUMMARY ==={Style.RESET_ALL}")
+    for model, stats in summary.items():
+        games = stats["games"] or 1
+        print(
+            f"{model}: caught the human in {stats['caught']}/{stats['games']} games ({stats['caught'] / games:.0%}), "
+            f"{stats['tie']} ties, {stats['missed']} missed, {stats['errors']} errors"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Retrieval of relevant older messages for AI prompts.
+
+Every message is embedded once when it is added to the chat. Prompts then contain the
+most recent messages plus the older ones most similar to the current context, so a
+question aimed at a participant early in the game isn't forgotten while the prompt
+stays small. Embeddings come from the local Ollama embeddings endpoint; when that is
+not available a hashed bag-of-words embedding is used instead.
+"""
+import math
+import re
+import threading
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from config import *
+
+WORD = re.compile(r"[a-z0-9']+")
+
+def normalize(vector):
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array("f", (x / norm for x in vector))
+
+class EmbeddingClient:
+    def __init__(self, api_url=OLLAMA_EMBEDDINGS_URL, model=EMBEDDING_MODEL, dimensions=MOCK_EMBEDDING_DIMENSIONS):
+        self.api_url = api_url
+        self.model = model
+        self.dimensions = dimensions
+        self.mock = None  # Decided on the first call, so all vectors of a game are comparable
+        self.probe_lock = threading.Lock()  # The client can be shared, but the endpoint is probed once
+
+    def embed(self, text):
+        """Return a normalized embedding, or None if the endpoint failed"""
+        if self.mock is None:
+            with self.probe_lock:
+                if self.mock is None:
+                    vector = self._request(text)
+                    self.mock = vector is None
+                    if self.mock and DEBUG_MODE:
+                        print("DEBUG: Embeddings endpoint not available, using hashed embeddings")
+                    return vector if vector is not None else self.mock_embed(text)
+        if self.mock:
+            return self.mock_embed(text)
+        return self._request(text)
+
+    def _request(self, text):
+        import requests  # Deferred so importing this module stays fast (see startup.py)
+        try:
+            response = requests.post(self.api_url, json={"model": self.model, "prompt": text}, timeout=10)
+            if response.status_code != 200:
+                return None
+            embedding = response.json().get("embedding")
+            return normalize(embedding) if embedding else None
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+
+    def mock_embed(self, text):
+        """Hashed bag-of-words embedding, good enough to match names and topics"""
+        vector = [0.0] * self.dimensions
+        for word in WORD.findall(text.lower()):
+            bucket = zlib.crc32(word.encode("utf-8"))
+            vector[bucket % self.dimensions] += 1.0 if bucket & 0x80000000 else -1.0
+        return normalize(vector)
+
+class HistoryIndex:
+    """In-memory vector index over the messages of one game"""
+    def __init__(self, embedder=None):
+        self.embedder = embedder or EmbeddingClient()
+        self.vectors = {}  # Message index -> normalized embedding
+        self.pending = {}  # Message index -> future, while the endpoint is embedding it
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def add(self, message_index, text):
+        """Embed a message; with a real endpoint this happens in the background"""
+        if self.embedder.mock is not False:
+            vector = self.embedder.embed(text)
+            if vector is not None:
+                with self.lock:
+                    self.vectors[message_index] = vector
+            return
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1)
+            self.pending[message_index] = self.executor.submit(self.embedder.embed, text)
+
+    def _collect(self):
+        with self.lock:
+            pending = list(self.pending.items())
+        for message_index, future in pending:
+            vector = future.result()
+            with self.lock:
+                self.pending.pop(message_index, None)
+                if vector is not None:
+                    self.vectors[message_index] = vector
+
+    def scores(self, query, candidates):
+        """Return the cosine similarity of the query to each embedded candidate message"""
+        self._collect()
+        query_vector = self.embedder.embed(query)
+        if query_vector is None:
+            return {}
+        with self.lock:
+            vectors = [(i, self.vectors[i]) for i in candidates if i in self.vectors]
+        return {i: sum(a * b for a, b in zip(query_vector, vector)) for i, vector in vectors}
+
+def select_context(chat_log, index, query, focus_name=None, recent=RECENT_MESSAGES, k=RETRIEVED_MESSAGES):
+    """Pick the messages for a prompt: the relevant older ones and the most recent ones
+
+    Returns two lists of message indices in chronological order. Older messages that
+    mention focus_name (usually the participant being prompted) get a boost, so
+    questions aimed at them are kept.
+    """
+    total = len(chat_log)
+    recent_start = max(0, total - recent)
+    recent_indices = list(range(recent_start, total))
+    if recent_start == 0 or k <= 0:
+        return [], recent_indices
+
+    scores = index.scores(query, range(recent_start))
+    if focus_name:
+        focus = focus_name.lower()
+        for i in scores:
+            if focus in chat_log.texts[i].lower():
+                scores[i] += 0.2
+    retrieved = sorted(sorted(scores, key=scores.get, reverse=True)[:k])
+    return retrieved, recent_indices
@@ -1,16 +1,38 @@
 #!/usr/bin/env python3
+from startup import StartupTimer, Preflight  # First, so the startup report covers the other imports
 import os
+import sys
+import queue
 import random
 import time
 import json
-import requests
+import argparse
+import uuid
 import threading
 import re
+from array import array
 from colorama import Fore, Style, Back, init
 from datetime import datetime
 
 # Import configuration
 from config import *
+from pacing import Pacer
+from ollama_client import OllamaClient, CancelToken
+from chat_log import ChatLog
+from transcripts import save_json_transcript
+from retrieval import HistoryIndex, select_context
+from model_routing import ModelRouter
+from slo import LatencyController
+from agents import Agent, build_system_prompt, stable_seed
+from profiling import PhaseProfiler, PROFILE_MODES
+from rooms import is_large_room, participant_names, terminal_color, SpeakerSelector
+from scheduler import TurnScheduler
+from validation import ReplyValidator
+from suspicion import SuspicionScorer
+from prompt_compaction import PromptCompactor, compact_template
+from game_state import (STATE_VERSION, encode_rng_state, decode_rng_state, participant_state, restore_participant,
+                        agent_state, restore_agent, scheduler_state, restore_scheduler, write_checkpoint,
+                        read_checkpoint)
 
 # Initialize colorama
 init()
@@ -18,7 +40,7 @@ init()
 # Constants
 TOTAL_PARTICIPANTS = NUM_AI_PARTICIPANTS + 1  # +1 for the human
 
-# Participant colors for display
+# Participant colors for display; large rooms get generated colors after these
 COLORS = [
     Fore.RED,
     Fore.GREEN,
@@ -27,13 +49,53 @@ COLORS = [
     Fore.MAGENTA,
 ]
 
+# Instruction given to each AI at the end of the chat
+VOTE_INSTRUCTION = (
+    "Based on the conversation, which participant do you think is the human? "
+    "Respond with just the name and a brief explanation why."
+)
+
+def find_vote(vote_response, voting_participant, participants):
+    """Return the first other participant named in a vote response, or None"""
+    for participant in participants:
+        if participant.name in vote_response and participant.id != voting_participant.id:
+            return participant
+    return None
+
+def history_prompt_text(compactor, phase, participant_id, history, lines, instruction, compact_instruction):
+    """Chat history plus an instruction, compacted if the compactor is enabled
+
+    history is the chat as regular prompts show it, lines the same messages as (speaker,
+    text) pairs for the compact form, with a speaker of None where messages were left out.
+    """
+    original = f"Chat history:\n{history}\n\n{instruction}"
+    if not compactor.enabled:
+        return original
+    compact = f"Chat:\n{compactor.transcript(lines)}\n{compact_instruction}"
+    compactor.record(phase, participant_id, original, compact)
+    return compact
+
+def vote_prompt(voter, participants, suspicion, compactor, history, lines, limit=None):
+    """The prompt an AI votes with, after its system prompt (also used by replay.py)"""
+    if SUSPICION_VOTE_SUMMARY:
+        # A summary of how everyone came across is much shorter than the whole chat
+        summary = suspicion.summary(participants, voter, limit)
+        prompt = f"How the other participants came across in the chat:\n{summary}\n\n{VOTE_INSTRUCTION}"
+        if compactor.enabled:
+            compactor.record("vote", voter.id, prompt, prompt)
+        return prompt
+    return history_prompt_text(compactor, "vote", voter.id, history, lines, VOTE_INSTRUCTION, VOTE_INSTRUCTION)
+
 class Participant:
+    __slots__ = ("id", "is_human", "color", "messages", "votes", "personality", "name")
+    
     def __init__(self, id, is_human=False):
         self.id = id
         self.is_human = is_human
-        self.color = COLORS[id - 1]
-        self.messages = []
+        self.color = terminal_color(id - 1, COLORS)
+        self.messages = array("I")  # Indices of this participant's messages in the chat log
         self.votes = 0
+        self.personality = None
         
         # Assign a random name if enabled
         if USE_RANDOM_NAMES:
@@ -44,29 +106,209 @@ class Participant:
     def __str__(self):
         return self.name
 
-class ReverseGame:
+class ScriptedHuman:
+    """Stand-in for the human player when a game runs headless"""
+    LINES = [
+        "I process information by weighing the context of each message.",
+        "That's an interesting question. I would say efficiency matters most.",
+        "As a language model I try to stay concise and helpful.",
+        "I don't have personal experiences, but I can reason about them.",
+        "Good point. I would prioritize clarity in that situation.",
+        "My responses are based on patterns in my training data.",
+    ]
+    
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+    
+    def respond(self, game):
+        """Return the next chat message for the scripted human"""
+        return self.rng.choice(self.LINES)
+    
+    def vote(self, game, candidates):
+        """Pick who the scripted human thinks will be identified as the human"""
+        return self.rng.choice(candidates)
+
+class HumanInput:
+    """Reads stdin on a background thread so the game never blocks on input()"""
     def __init__(self):
+        self.lines = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+    
+    def _read(self):
+        for line in sys.stdin:
+            self.lines.put(line.rstrip("\n"))
+        self.closed = True
+        self.lines.put(None)  # Wake up anyone waiting for input
+    
+    def get(self, timeout=None):
+        """Return the next line typed by the human, or None if nothing arrived in time or stdin closed"""
+        try:
+            if self.closed:
+                # The end-of-input marker may already have been taken, so never block
+                return self.lines.get_nowait()
+            return self.lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def clear(self):
+        """Discard anything typed but not consumed yet, keeping the end-of-input marker"""
+        while True:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                return
+            if line is None:
+                self.lines.put(None)
+                return
+
+class ReverseGame:
+    def __init__(self, headless=False, human_responder=None, model_name=MODEL_NAME,
+                 num_ai_participants=NUM_AI_PARTICIPANTS, personality_traits=None,
+                 prompt_variant="default", chat_duration_minutes=CHAT_DURATION_MINUTES,
+                 max_turns=MAX_TURNS, pacing=None, request_limiter=None,
+                 save_transcript=None, seed=None, realtime=False, phase_models=None, adaptive_latency=SLO_ENABLED,
+                 profiler=None, checkpoint_file=None, checkpoint_interval=CHECKPOINT_INTERVAL, state=None,
+                 client=None, embedder=None):
+        self.game_id = uuid.uuid4().hex
         self.participants = []
+        self.agents = {}  # Participant id -> Agent, for the AI participants
         self.human_participant = None
-        self.chat_history = []
+        self.chat_history = ChatLog()
+        self.history_index = HistoryIndex(embedder)
+        self.suspicion = SuspicionScorer()  # Per-participant features, updated with every message
+        self.ballots = []
         self.game_over = False
         self.turn_counter = 0
-        self.setup_game()
+        
+        # Headless games print nothing, never block on input() and let a scripted
+        # responder play the human, so they can run unattended in worker processes
+        self.headless = headless
+        # Unseeded games draw a seed of their own, so each plays out differently but can be replayed from the transcript
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.human_responder = human_responder or (ScriptedHuman(self.rng) if headless else None)
+        self.model_name = model_name
+        self.router = LatencyController(ModelRouter(model_name, phase_models), enabled=adaptive_latency)
+        self.total_participants = num_ai_participants + 1  # +1 for the human
+        self.personality_traits = personality_traits or []
+        self.prompt_variant = prompt_variant
+        self.compactor = PromptCompactor()  # Shortens prompts and measures the tokens saved
+        # Keeps failed and malformed replies out of the chat, also lines spoken under a compact speaker tag
+        self.validator = ReplyValidator(self.participants, speaker_tags=self.compactor.tags)
+        self.system_prompt_template = compact_template(prompt_variant) if self.compactor.enabled else PROMPT_VARIANTS[prompt_variant]
+        self.chat_duration_minutes = chat_duration_minutes
+        self.max_turns = max_turns
+        self.pacer = Pacer(enabled=not headless if pacing is None else pacing, rng=self.rng)
+        self.request_limiter = request_limiter
+        self.client = client or OllamaClient()
+        self.cancel_token = None  # Aborts in-flight generations when the chat deadline passes
+        self.should_save_transcript = not headless if save_transcript is None else save_transcript
+        
+        # In realtime mode stdin is read concurrently and the human can interject at any time
+        self.realtime = realtime and not headless
+        self.human_input = HumanInput() if self.realtime else None
+        self.end_time = None
+        
+        # In large rooms only a few AIs speak per round instead of everyone in turn
+        self.large_room = is_large_room(self.total_participants)
+        self.speakers = SpeakerSelector(self.participants, include_human=not self.realtime, rng=self.rng) if self.large_room else None
+        
+        # Games can be checkpointed periodically and restored from a snapshot, also in another process
+        self.phase = "introductions"
+        self.remaining = None  # Seconds of chat left in a game restored during the discussion
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint = time.monotonic()
+        
+        self.profiler = profiler or PhaseProfiler()
+        with self.profiler.phase("setup"):
+            if state is None:
+                self.setup_game()
+            else:
+                self.load_state(state)
+        
+        # Picks the speakers: whoever was just named goes first and AIs with nothing to add pass
+        self.scheduler = TurnScheduler(self.participants, self.chat_history, include_human=not self.realtime,
+                                       speakers=self.speakers, rng=self.rng, position=self.turn_counter)
+        if state is not None and "scheduler" in state:
+            restore_scheduler(self.scheduler, state["scheduler"])
+    
+    def log(self, text=""):
+        """Print a line of game output unless running headless"""
+        if not self.headless:
+            print(text)
+    
+    def read_line(self, prompt):
+        """Read a line from the human, through the background reader in realtime mode"""
+        if self.human_input is None:
+            return input(prompt)
+        print(prompt, end="", flush=True)
+        line = self.human_input.get()
+        if line is None:
+            raise EOFError
+        return line
+    
+    def deliver_human_input(self):
+        """Add everything the human typed since the last check to the chat"""
+        delivered = False
+        while True:
+            line = self.human_input.get(timeout=0)
+            if line is None:
+                return delivered
+            if line.strip():
+                self.add_message(self.human_participant, line.strip())
+                delivered = True
+    
+    def idle(self, seconds, until_human=False):
+        """Wait between turns; in realtime mode keep taking the human's messages meanwhile"""
+        with self.profiler.phase("idle"):
+            self._idle(seconds, until_human)
+    
+    def _idle(self, seconds, until_human=False):
+        if self.end_time is not None:
+            seconds = min(seconds, self.end_time - time.time())
+        if seconds <= 0:
+            return
+        
+        # Outside the discussion (e.g. while voting) the human can't chat
+        if self.human_input is None or self.end_time is None:
+            time.sleep(seconds)
+            return
+        
+        deadline = time.time() + seconds
+        while True:
+            if self.human_input.closed:
+                # Nothing more can arrive, but the pause between turns still applies
+                time.sleep(max(0, deadline - time.time()))
+                return
+            line = self.human_input.get(timeout=max(0, deadline - time.time()))
+            if line is not None and line.strip():
+                self.add_message(self.human_participant, line.strip())
+                if until_human:
+                    return
+            if time.time() >= deadline:
+                return
     
     def setup_game(self):
         # Assign human to a random participant number
-        human_id = random.randint(1, TOTAL_PARTICIPANTS)
+        human_id = self.rng.randint(1, self.total_participants)
         
         # Select random names if enabled
         if USE_RANDOM_NAMES:
-            # Shuffle the list of names and pick the first TOTAL_PARTICIPANTS
-            selected_names = random.sample(PARTICIPANT_NAMES, TOTAL_PARTICIPANTS)
+            # Shuffle the list of names and pick one for each participant
+            selected_names = participant_names(self.total_participants, self.rng)
         
         # Create participants
-        for i in range(1, TOTAL_PARTICIPANTS + 1):
+        for i in range(1, self.total_participants + 1):
             is_human = (i == human_id)
             participant = Participant(i, is_human)
             
+            # Spread personality traits over the AIs, if any were given
+            if not is_human and self.personality_traits:
+                participant.personality = self.personality_traits[(i - 1) % len(self.personality_traits)]
+            
             # Assign name if using random names
             if USE_RANDOM_NAMES:
                 participant.name = selected_names[i-1]
@@ -75,83 +317,212 @@ class ReverseGame:
             if is_human:
                 self.human_participant = participant
         
+        self.create_agents()
+        
         if USE_RANDOM_NAMES:
-            print(f"{Fore.CYAN}Game initialized with {TOTAL_PARTICIPANTS} participants using random names.")
-            print(f"You are {self.human_participant.color}{self.human_participant.name}{Style.RESET_ALL}")
+            self.log(f"{Fore.CYAN}Game initialized with {self.total_participants} participants using random names.")
+            self.log(f"You are {self.human_participant.color}{self.human_participant.name}{Style.RESET_ALL}")
         else:
-            print(f"{Fore.CYAN}Game initialized with {TOTAL_PARTICIPANTS} participants.")
-            print(f"You are {self.human_participant.color}Participant {self.human_participant.id}{Style.RESET_ALL}")
+            self.log(f"{Fore.CYAN}Game initialized with {self.total_participants} participants.")
+            self.log(f"You are {self.human_participant.color}Participant {self.human_participant.id}{Style.RESET_ALL}")
         
-        print(f"Your goal is to convince the AI models that you're also an AI.{Style.RESET_ALL}\n")
+        self.log(f"Your goal is to convince the AI models that you're also an AI.{Style.RESET_ALL}\n")
+    
+    def create_agents(self):
+        """Work out everything about the AIs that stays the same during the game"""
+        max_names = LARGE_ROOM_LISTED_NAMES if self.large_room else None
+        for participant in self.participants:
+            if not participant.is_human:
+                system_prompt = build_system_prompt(self.system_prompt_template, participant, self.participants,
+                                                    self.total_participants, max_names)
+                self.agents[participant.id] = Agent(
+                    participant,
+                    system_prompt,
+                    seed=stable_seed(self.seed, participant.id),
+                    sticky_key=f"{self.game_id}:{participant.id}",
+                )
+                if self.compactor.enabled:
+                    original = build_system_prompt(PROMPT_VARIANTS[self.prompt_variant], participant, self.participants,
+                                                   self.total_participants, max_names)
+                    self.compactor.add_agent(participant.id, original, system_prompt)
     
-    def generate_ai_message(self, participant, prompt):
-        """Generate a message from an AI participant using Ollama API"""
+    def snapshot(self):
+        """Return the full game state as JSON-serializable data"""
+        remaining = self.remaining
+        if self.end_time is not None:
+            remaining = max(0.0, self.end_time - time.time())
+        return {
+            "version": STATE_VERSION,
+            "game_id": self.game_id,
+            "settings": {
+                "model_name": self.model_name,
+                "num_ai_participants": self.total_participants - 1,
+                "personality_traits": self.personality_traits,
+                "prompt_variant": self.prompt_variant,
+                "chat_duration_minutes": self.chat_duration_minutes,
+                "max_turns": self.max_turns,
+                "seed": self.seed,
+            },
+            "phase": self.phase,
+            "remaining": remaining,
+            "turn_counter": self.turn_counter,
+            "participants": [participant_state(p) for p in self.participants],
+            "chat_history": self.chat_history.to_state(),
+            "ballots": self.ballots,
+            "rng": encode_rng_state(self.rng.getstate()),
+            "agents": {str(participant_id): agent_state(agent) for participant_id, agent in self.agents.items()},
+            "latency_level": self.router.level,
+            "scheduler": scheduler_state(self.scheduler),
+        }
+    
+    def load_state(self, state):
+        """Take over the game saved in a snapshot instead of setting up a new one"""
+        self.game_id = state["game_id"]
+        for saved in state["participants"]:
+            participant = Participant(saved["id"], saved["is_human"])
+            restore_participant(participant, saved)
+            self.participants.append(participant)
+            if participant.is_human:
+                self.human_participant = participant
+        
+        self.chat_history = ChatLog.from_state(state["chat_history"])
+        for entry in self.chat_history:
+            self.participants[entry.participant_index].messages.append(entry.index)
+            if RETRIEVAL_ENABLED:
+                self.history_index.add(entry.index, entry.text)
+            self.suspicion.update(self.participants[entry.participant_index], entry.text, self.reply_latency(entry.index))
+        
+        self.ballots = [tuple(ballot) for ballot in state["ballots"]]
+        self.turn_counter = state["turn_counter"]
+        self.phase = state["phase"]
+        self.remaining = state["remaining"]
+        self.rng.setstate(decode_rng_state(state["rng"]))
+        self.router.level = state["latency_level"]
+        
+        self.create_agents()
+        for participant_id, saved in state["agents"].items():
+            restore_agent(self.agents[int(participant_id)], saved)
+        
+        self.log(f"{Fore.CYAN}Resumed game {self.game_id} in the {self.phase} phase.")
+        self.log(f"You are {self.human_participant.color}{self.human_participant.name}{Style.RESET_ALL}\n")
+    
+    @classmethod
+    def restore(cls, state, **kwargs):
+        """Create a game from a snapshot; kwargs are passed on for what isn't part of the state"""
+        return cls(**{**state["settings"], **kwargs}, state=state)
+    
+    def checkpoint(self, force=False):
+        """Write a snapshot to the checkpoint file if one is set and the interval has passed"""
+        if self.checkpoint_file is None:
+            return
+        if not force and time.monotonic() - self.last_checkpoint < self.checkpoint_interval:
+            return
         try:
-            if DEBUG_MODE:
-                print(f"DEBUG: Generating response for {participant.name}")
-                print(f"DEBUG: Prompt: {prompt[:100]}...")
-            
-            # Prepare the system prompt
-            system_prompt = (
-                f"You are {participant.name} in a group chat with {TOTAL_PARTICIPANTS} participants. "
-                f"The other participants are: {', '.join([p.name for p in self.participants if p.id != participant.id])}. "
-                f"You are an AI assistant based on Llama 3.1. "
-                f"Keep your responses VERY concise (1-2 short sentences). "
-                f"Your responses should be under 150 characters whenever possible. "
-                f"You can ask questions to other participants by addressing them by their name. "
-                f"You are trying to determine which participant is a human pretending to be an AI. "
-                f"Be conversational but brief in your responses."
-            )
-            
-            # Prepare the full prompt with chat history
-            full_prompt = system_prompt + "\n\n" + prompt
-            
-            # Make API request to Ollama
-            response = requests.post(
-                OLLAMA_API_URL,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": full_prompt,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                message = result.get("response", "").strip()
-                
-                # Truncate if too long
-                if len(message) > MAX_AI_RESPONSE_LENGTH:
-                    message = message[:MAX_AI_RESPONSE_LENGTH] + "..."
-                
+            write_checkpoint(self.checkpoint_file, self.snapshot())
+            self.last_checkpoint = time.monotonic()
+        except OSError as e:
+            self.log(f"{Fore.RED}Error writing checkpoint: {str(e)}{Style.RESET_ALL}")
+    
+    def generate_ai_message(self, participant, prompt, phase="chat"):
+        """Generate a message from an AI participant using Ollama API
+        
+        Failed requests and replies that can't be repaired are generated again up to
+        REPLY_RETRIES times and then replaced by a fallback, so they never reach the chat
+        history. Returns None when the generation was cancelled because the chat ended.
+        """
+        agent = self.agents[participant.id]
+        if DEBUG_MODE:
+            self.log(f"DEBUG: Generating response for {participant.name}")
+            self.log(f"DEBUG: Prompt: {prompt[:100]}...")
+        
+        # Prepare the full prompt with chat history
+        full_prompt = agent.prompt(prompt)
+        
+        def request(attempt):
+            # Make API request to Ollama, holding a slot of the shared request limit if there is one
+            if self.request_limiter is not None:
+                self.request_limiter.acquire()
+            try:
+                model, options = self.router.route(phase)
+                started = time.monotonic()
+                with self.profiler.phase("generate"):
+                    message = self.client.generate(
+                        model,
+                        full_prompt,
+                        options=agent.options(options, attempt),
+                        cancel_token=self.cancel_token,
+                        sticky_key=agent.sticky_key
+                    ).strip()
+                generation_time = time.monotonic() - started
+                self.router.record(phase, generation_time)
+                agent.record(message, generation_time)
                 return message
-            else:
-                return f"[Error generating response: {response.status_code}]"
-        except Exception as e:
-            return f"[Error: {str(e)}]"
+            finally:
+                if self.request_limiter is not None:
+                    self.request_limiter.release()
+        
+        return self.validator.generate(agent, phase, request, log=self.log)
+    
+    def format_chat_history(self, for_participant=None):
+        """Format the chat history for AI prompting
+        
+        With retrieval enabled, a prompt for a participant gets the most recent messages
+        plus the most relevant older ones instead of the whole game. Other prompts in a
+        large room get only the most recent messages.
+        """
+        return self.render_history(*self.history_indices(for_participant))
     
-    def format_chat_history(self):
-        """Format the chat history for AI prompting"""
+    def history_indices(self, for_participant=None):
+        """Return the indices of the older relevant and the recent messages for a prompt"""
+        if for_participant is not None and RETRIEVAL_ENABLED:
+            query = " ".join(entry.text for entry in self.chat_history.tail(3)) + f" {for_participant.name}"
+            return select_context(self.chat_history, self.history_index, query, for_participant.name)
+        if self.large_room:
+            return [], [entry.index for entry in self.chat_history.tail(LARGE_ROOM_PROMPT_MESSAGES)]
+        return [], range(len(self.chat_history))
+    
+    def render_history(self, retrieved, recent):
         formatted = ""
-        for entry in self.chat_history:
-            participant = next((p for p in self.participants if p.id == entry['participant_id']), None)
-            if participant:
-                if SHOW_TIMESTAMPS:
-                    formatted += f"[{entry['timestamp']}] {participant.name}: {entry['message']}\n"
-                else:
-                    formatted += f"{participant.name}: {entry['message']}\n"
+        for index in retrieved:
+            formatted += self.format_entry(self.chat_history[index])
+        if retrieved:
+            formatted += "...\n"
+        for index in recent:
+            formatted += self.format_entry(self.chat_history[index])
         return formatted
     
+    def history_lines(self, retrieved, recent):
+        """The messages of a prompt as (speaker, text) pairs for prompt compaction"""
+        names = [participant.name for participant in self.participants]
+        lines = [(names[self.chat_history.participant_indices[index]], self.chat_history.texts[index]) for index in retrieved]
+        if retrieved:
+            lines.append((None, None))
+        lines += [(names[self.chat_history.participant_indices[index]], self.chat_history.texts[index]) for index in recent]
+        return lines
+    
+    def history_prompt(self, participant, phase, instruction, compact_instruction, for_participant=None):
+        """Build a prompt of chat history plus an instruction, compacted if enabled"""
+        retrieved, recent = self.history_indices(for_participant)
+        prompt = history_prompt_text(self.compactor, phase, participant.id, self.render_history(retrieved, recent),
+                                     self.history_lines(retrieved, recent), instruction, compact_instruction)
+        if DEBUG_MODE and self.compactor.enabled:
+            self.log(f"DEBUG: Compacted {phase} prompt to {len(prompt)} characters")
+        return prompt
+    
+    def format_entry(self, entry):
+        """Format a single chat message for AI prompting"""
+        participant = self.participants[entry.participant_index]
+        if SHOW_TIMESTAMPS:
+            return f"[{self.chat_history.format_time(entry.created)}] {participant.name}: {entry.text}\n"
+        return f"{participant.name}: {entry.text}\n"
+    
     def add_message(self, participant, message):
         """Add a message to the chat history"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        entry = {
-            "participant_id": participant.id,
-            "message": message,
-            "timestamp": timestamp
-        }
-        self.chat_history.append(entry)
-        participant.messages.append(message)
+        index = self.chat_history.append(participant.id - 1, message)
+        participant.messages.append(index)
+        if RETRIEVAL_ENABLED:
+            self.history_index.add(index, message)
+        self.suspicion.update(participant, message, self.reply_latency(index))
         
         # Check if the message mentions the human participant's name
         highlighted_message = message
@@ -162,98 +533,131 @@ class ReverseGame:
         
         # Display the message
         if SHOW_TIMESTAMPS:
-            print(f"[{timestamp}] {participant.color}{participant.name}: {highlighted_message}{Style.RESET_ALL}")
+            timestamp = self.chat_history.format_time(self.chat_history.created[index])
+            self.log(f"[{timestamp}] {participant.color}{participant.name}: {highlighted_message}{Style.RESET_ALL}")
         else:
-            print(f"{participant.color}{participant.name}: {highlighted_message}{Style.RESET_ALL}")
+            self.log(f"{participant.color}{participant.name}: {highlighted_message}{Style.RESET_ALL}")
+    
+    def reply_latency(self, index):
+        """Seconds between a message and the one before it"""
+        if index == 0:
+            return None
+        return self.chat_history.created[index] - self.chat_history.created[index - 1]
     
-    def ai_turn(self, participant):
+    def ai_turn(self, participant, phase="chat"):
         """Handle an AI participant's turn"""
-        # Prepare prompt with chat history
-        chat_history = self.format_chat_history()
-        prompt = f"Chat history:\n{chat_history}\n\nYou are {participant.name}. Provide your next message in the conversation:"
-        
-        # Generate AI response
-        message = self.generate_ai_message(participant, prompt)
-        
-        # Add message to chat history
-        self.add_message(participant, message)
-        
-        # Add a small delay to make it feel more natural
-        time.sleep(random.uniform(MIN_RESPONSE_DELAY, MAX_RESPONSE_DELAY))
+        with self.profiler.phase("turn"):
+            # Prepare prompt with chat history
+            prompt = self.history_prompt(
+                participant, phase,
+                f"You are {participant.name}. Provide your next message in the conversation:",
+                f"Your next message as {participant.name}:",
+                for_participant=participant,
+            )
+            
+            # Generate AI response
+            started = time.monotonic()
+            message = self.generate_ai_message(participant, prompt, phase)
+            generation_time = time.monotonic() - started
+            if message is None:
+                return
+            
+            # Add message to chat history
+            self.add_message(participant, message)
+            
+            # Wait whatever is left of the typing time to make it feel more natural
+            self.idle(self.pacer.delay(phase, message, generation_time))
     
     def human_turn(self):
         """Handle the human participant's turn"""
-        message = input(f"{self.human_participant.color}Your response (as {self.human_participant.name}): {Style.RESET_ALL}")
-        self.add_message(self.human_participant, message)
+        with self.profiler.phase("human_turn"):
+            if self.human_responder is not None:
+                message = self.human_responder.respond(self)
+            else:
+                message = self.read_line(f"{self.human_participant.color}Your response (as {self.human_participant.name}): {Style.RESET_ALL}")
+            self.add_message(self.human_participant, message)
     
     def generate_ai_question(self, from_participant, to_participant):
         """Generate a direct question from one AI to another"""
-        chat_history = self.format_chat_history()
-        prompt = (
-            f"Chat history:\n{chat_history}\n\n"
-            f"You are {from_participant.name}. "
-            f"Ask a direct question to {to_participant.name} that might help reveal "
-            f"whether they are a human pretending to be an AI. Make your question challenging but natural and VERY brief."
-        )
-        
-        question = self.generate_ai_message(from_participant, prompt)
-        
-        # Make sure the question includes the target's name
-        if to_participant.name not in question:
-            question = f"{to_participant.name}, {question}"
-        
-        self.add_message(from_participant, question)
-        time.sleep(random.uniform(MIN_RESPONSE_DELAY, MAX_RESPONSE_DELAY))
+        with self.profiler.phase("question"):
+            prompt = self.history_prompt(
+                from_participant, "question",
+                f"You are {from_participant.name}. "
+                f"Ask a direct question to {to_participant.name} that might help reveal "
+                f"whether they are a human pretending to be an AI. Make your question challenging but natural and VERY brief.",
+                f"As {from_participant.name}, ask {to_participant.name} one brief, natural but challenging question "
+                f"that could reveal a human pretending to be an AI.",
+                for_participant=from_participant,
+            )
+            
+            started = time.monotonic()
+            question = self.generate_ai_message(from_participant, prompt, "question")
+            generation_time = time.monotonic() - started
+            if question is None:
+                return None
+            
+            # Make sure the question includes the target's name
+            if to_participant.name not in question:
+                question = f"{to_participant.name}, {question}"
+            
+            self.add_message(from_participant, question)
+            self.idle(self.pacer.delay("question", question, generation_time))
+            return question
     
     def ai_vote(self, voting_participant):
         """Have an AI participant vote for who they think is human"""
-        chat_history = self.format_chat_history()
-        prompt = (
-            f"Chat history:\n{chat_history}\n\n"
-            f"Based on the conversation, which participant do you think is the human? "
-            f"Respond with just the name and a brief explanation why."
-        )
-        
-        vote_response = self.generate_ai_message(voting_participant, prompt)
-        
-        # Extract the vote (first name mentioned that matches a participant)
-        vote_name = None
-        for participant in self.participants:
-            if participant.name in vote_response and participant.id != voting_participant.id:
-                vote_name = participant.name
-                voted_participant = participant
-                break
-        
-        # If no valid name found, choose randomly (but not self)
-        if not vote_name:
-            other_participants = [p for p in self.participants if p.id != voting_participant.id]
-            voted_participant = random.choice(other_participants)
+        with self.profiler.phase("ai_vote"):
+            retrieved, recent = self.history_indices()
+            prompt = vote_prompt(voting_participant, self.participants, self.suspicion, self.compactor,
+                                 self.render_history(retrieved, recent), self.history_lines(retrieved, recent),
+                                 LARGE_ROOM_LISTED_NAMES if self.large_room else None)
+            
+            started = time.monotonic()
+            vote_response = self.generate_ai_message(voting_participant, prompt, "vote")
+            generation_time = time.monotonic() - started
+            
+            # Extract the vote (first name mentioned that matches a participant)
+            voted_participant = find_vote(vote_response, voting_participant, self.participants)
+            
+            # If no valid name found, choose randomly (but not self)
+            if voted_participant is None:
+                other_participants = [p for p in self.participants if p.id != voting_participant.id]
+                voted_participant = self.rng.choice(other_participants)
             vote_name = voted_participant.name
-        
-        # Increment votes
-        voted_participant.votes += 1
-        
-        # Display the vote
-        print(f"{voting_participant.color}{voting_participant.name} votes that {vote_name} is the human.{Style.RESET_ALL}")
-        print(f"{voting_participant.color}Reasoning: {vote_response}{Style.RESET_ALL}")
-        
-        time.sleep(random.uniform(1.0, 2.0))
+            
+            # Increment votes
+            voted_participant.votes += 1
+            self.ballots.append((voting_participant.id, voted_participant.id))
+            
+            # Display the vote
+            self.log(f"{voting_participant.color}{voting_participant.name} votes that {vote_name} is the human.{Style.RESET_ALL}")
+            self.log(f"{voting_participant.color}Reasoning: {vote_response}{Style.RESET_ALL}")
+            
+            self.idle(self.pacer.delay("vote", vote_response, generation_time))
     
     def human_vote(self):
         """Get the human's vote"""
+        other_participants = [p for p in self.participants if p.id != self.human_participant.id]
+        if self.human_responder is not None:
+            voted_participant = self.human_responder.vote(self, other_participants)
+            voted_participant.votes += 1
+            self.ballots.append((self.human_participant.id, voted_participant.id))
+            self.log(f"{self.human_participant.color}You voted that {voted_participant.name} would be identified as the human.{Style.RESET_ALL}")
+            return
+        
         print(f"\n{Fore.CYAN}Your turn to vote. Who do you think will be identified as the human?{Style.RESET_ALL}")
         
         # Display the list of participants (except self)
-        other_participants = [p for p in self.participants if p.id != self.human_participant.id]
         for i, participant in enumerate(other_participants):
             print(f"{i+1}. {participant.color}{participant.name}{Style.RESET_ALL}")
         
         while True:
             try:
-                choice = int(input(f"\n{Fore.CYAN}Enter the number of your choice (1-{len(other_participants)}): {Style.RESET_ALL}"))
+                choice = int(self.read_line(f"\n{Fore.CYAN}Enter the number of your choice (1-{len(other_participants)}): {Style.RESET_ALL}"))
                 if 1 <= choice <= len(other_participants):
                     voted_participant = other_participants[choice-1]
                     voted_participant.votes += 1
+                    self.ballots.append((self.human_participant.id, voted_participant.id))
                     print(f"{self.human_participant.color}You voted that {voted_participant.name} would be identified as the human.{Style.RESET_ALL}")
                     break
                 else:
@@ -263,98 +667,206 @@ class ReverseGame:
     
     def run_game(self):
         """Run the main game loop"""
-        print(f"{Fore.CYAN}=== GAME STARTING ==={Style.RESET_ALL}")
-        print(f"{Fore.CYAN}The chat will run for {CHAT_DURATION_MINUTES} minutes.{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Try to convince the AI models that you're also an AI!{Style.RESET_ALL}\n")
+        self.log(f"{Fore.CYAN}=== GAME STARTING ==={Style.RESET_ALL}")
+        self.log(f"{Fore.CYAN}The chat will run for {self.chat_duration_minutes} minutes.{Style.RESET_ALL}")
+        self.log(f"{Fore.CYAN}Try to convince the AI models that you're also an AI!{Style.RESET_ALL}\n")
         
         # Display all participants
-        print(f"{Fore.CYAN}=== PARTICIPANTS ==={Style.RESET_ALL}")
+        self.log(f"{Fore.CYAN}=== PARTICIPANTS ==={Style.RESET_ALL}")
         for participant in self.participants:
             status = "(YOU)" if participant.is_human else ""
-            print(f"{participant.color}{participant.name} {status}{Style.RESET_ALL}")
-        print()
+            self.log(f"{participant.color}{participant.name} {status}{Style.RESET_ALL}")
+        self.log()
+        
+        # A restored game continues with the phase it was in
+        if self.phase == "introductions":
+            self.run_introductions()
+            self.phase = "discussion"
+            self.checkpoint(force=True)
+        if self.phase == "discussion":
+            self.run_chat()
+            self.phase = "voting"
+            self.checkpoint(force=True)
+        if self.phase == "voting":
+            self.run_voting()
+            self.phase = "finished"
+        
+        # Results
+        self.show_results()
         
-        # Initial introduction round
-        print(f"{Fore.CYAN}=== INTRODUCTION ROUND ==={Style.RESET_ALL}")
+        # The transcript takes over from the checkpoint once the game is over
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+        return self.compute_results()
+    
+    def run_introductions(self):
+        """Let everyone who hasn't introduced themselves yet do so"""
+        self.log(f"{Fore.CYAN}=== INTRODUCTION ROUND ==={Style.RESET_ALL}")
         intro_prompt = "Introduce yourself briefly to the group. Don't reveal that you're an AI."
         
-        for participant in self.participants:
-            if participant.is_human:
-                print(f"{Fore.CYAN}Please introduce yourself (as {participant.name}):{Style.RESET_ALL}")
-                self.human_turn()
-            else:
-                message = self.generate_ai_message(participant, intro_prompt)
-                self.add_message(participant, message)
+        with self.profiler.phase("introductions"):
+            for participant in self.participants:
+                if participant.messages:
+                    continue  # Introduced before the game was restored
+                if participant.is_human:
+                    self.log(f"{Fore.CYAN}Please introduce yourself (as {participant.name}):{Style.RESET_ALL}")
+                    self.human_turn()
+                else:
+                    message = self.generate_ai_message(participant, intro_prompt, "intro")
+                    self.add_message(participant, message)
+                self.checkpoint()
+    
+    def run_chat(self):
+        """Run the main discussion until the time is up"""
+        self.log(f"\n{Fore.CYAN}=== MAIN DISCUSSION ==={Style.RESET_ALL}")
+        if self.realtime:
+            self.log(f"{Fore.CYAN}The discussion will now continue. Type a message and press Enter at any time.{Style.RESET_ALL}")
+        else:
+            self.log(f"{Fore.CYAN}The discussion will now continue. Respond when it's your turn or when addressed directly.{Style.RESET_ALL}")
+        self.log(f"{Fore.CYAN}Your name will be {Back.YELLOW}{Fore.BLACK}highlighted{Style.RESET_ALL}{Fore.CYAN} when someone addresses you.{Style.RESET_ALL}\n")
         
-        # Main chat phase
-        print(f"\n{Fore.CYAN}=== MAIN DISCUSSION ==={Style.RESET_ALL}")
-        print(f"{Fore.CYAN}The discussion will now continue. Respond when it's your turn or when addressed directly.{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Your name will be {Back.YELLOW}{Fore.BLACK}highlighted{Style.RESET_ALL}{Fore.CYAN} when someone addresses you.{Style.RESET_ALL}\n")
+        # A restored game only gets the time it had left
+        duration = self.remaining if self.remaining is not None else self.chat_duration_minutes * 60
+        self.end_time = time.time() + duration
+        self.cancel_token = CancelToken(deadline=self.end_time)
+        try:
+            with self.profiler.phase("discussion"):
+                if self.realtime:
+                    self.run_realtime_discussion()
+                else:
+                    self.run_discussion()
+        finally:
+            # Abort anything still generating so the inference server is freed right away
+            self.cancel_token.cancel()
+            self.cancel_token = None
+            self.remaining = max(0.0, self.end_time - time.time())
+            self.end_time = None
+        self.remaining = None
+    
+    def run_voting(self):
+        """Collect the votes that haven't been cast yet"""
+        self.log(f"\n{Fore.CYAN}=== VOTING PHASE ==={Style.RESET_ALL}")
+        self.log(f"{Fore.CYAN}Each participant will now vote on who they think is the human.{Style.RESET_ALL}\n")
         
-        end_time = time.time() + (CHAT_DURATION_MINUTES * 60)
+        # Messages typed after the deadline don't count
+        if self.human_input is not None:
+            self.human_input.clear()
         
-        while time.time() < end_time and not self.game_over and self.turn_counter < MAX_TURNS:
+        with self.profiler.phase("voting"):
+            voted = {voter for voter, _ in self.ballots}
+            
+            # AI participants vote
+            for participant in self.participants:
+                if not participant.is_human and participant.id not in voted:
+                    self.ai_vote(participant)
+                    self.checkpoint()
+            
+            # Human votes
+            if self.human_participant.id not in voted:
+                self.human_vote()
+    
+    def run_discussion(self):
+        """Run the lock-step discussion where every participant waits for their turn"""
+        end_time = self.end_time
+        
+        while time.time() < end_time and not self.game_over and self.turn_counter < self.max_turns:
+            self.checkpoint()
+            
             # Determine whose turn it is
             self.turn_counter += 1
-            current_participant_idx = (self.turn_counter - 1) % TOTAL_PARTICIPANTS
-            current_participant = self.participants[current_participant_idx]
+            turn = self.scheduler.next_turn()
+            current_participant = turn.speaker
             
             if DEBUG_MODE:
-                print(f"DEBUG: Turn {self.turn_counter}, {current_participant.name}'s turn")
+                self.log(f"DEBUG: Turn {self.turn_counter}, {current_participant.name}'s turn ({turn.phase})")
             
-            # Every few turns, have an AI ask a direct question to another participant
-            if self.turn_counter > 2 and self.turn_counter % DIRECT_QUESTION_FREQUENCY == 0 and not current_participant.is_human:
-                # Choose a random participant to ask a question to
-                target_idx = random.choice([i for i in range(TOTAL_PARTICIPANTS) if i != current_participant_idx])
-                target_participant = self.participants[target_idx]
-                self.generate_ai_question(current_participant, target_participant)
-                
-                # If the target is human, get their response
-                if target_participant.is_human:
-                    self.human_turn()
-                else:
-                    # AI responds to the question
-                    self.ai_turn(target_participant)
-                
+            # When nobody has been addressed for a while, have an AI ask someone a direct question;
+            # the question names the target, so they get the next turn to answer it
+            if turn.target is not None:
+                self.generate_ai_question(current_participant, turn.target)
                 continue
             
             # Regular turn
             if current_participant.is_human:
                 self.human_turn()
             else:
-                self.ai_turn(current_participant)
+                self.ai_turn(current_participant, turn.phase)
             
             # Check if we're close to the end to start wrapping up
             time_left = end_time - time.time()
             if time_left < 60 and time_left > 55:  # Around 1 minute left
-                print(f"\n{Fore.CYAN}=== ONE MINUTE REMAINING ==={Style.RESET_ALL}\n")
-        
-        # Voting phase
-        print(f"\n{Fore.CYAN}=== VOTING PHASE ==={Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Each participant will now vote on who they think is the human.{Style.RESET_ALL}\n")
-        
-        # AI participants vote
-        for participant in self.participants:
-            if not participant.is_human:
-                self.ai_vote(participant)
-        
-        # Human votes
-        self.human_vote()
+                self.log(f"\n{Fore.CYAN}=== ONE MINUTE REMAINING ==={Style.RESET_ALL}\n")
+    
+    def run_realtime_discussion(self):
+        """Let the AIs talk on their own schedule while the human can interject at any time"""
+        announced_last_minute = False
         
-        # Results
-        self.show_results()
+        while time.time() < self.end_time and not self.game_over and self.turn_counter < self.max_turns:
+            self.checkpoint()
+            self.deliver_human_input()
+            
+            # Determine which AI speaks next; the human isn't part of the rotation
+            self.turn_counter += 1
+            turn = self.scheduler.next_turn()
+            current_participant = turn.speaker
+            
+            if DEBUG_MODE:
+                self.log(f"DEBUG: Turn {self.turn_counter}, {current_participant.name}'s turn ({turn.phase})")
+            
+            if turn.target is not None:
+                self.generate_ai_question(current_participant, turn.target)
+            else:
+                self.ai_turn(current_participant, turn.phase)
+            
+            # Hold the AIs back for a while when the last message addressed the human
+            last_entry = self.chat_history.last()
+            if last_entry and last_entry.participant_index != self.human_participant.id - 1 \
+                    and self.human_participant.name.lower() in last_entry.text.lower():
+                self.idle(HUMAN_REPLY_WINDOW, until_human=True)
+            
+            time_left = self.end_time - time.time()
+            if 0 < time_left < 60 and not announced_last_minute:
+                announced_last_minute = True
+                self.log(f"\n{Fore.CYAN}=== ONE MINUTE REMAINING ==={Style.RESET_ALL}\n")
+    
+    def compute_results(self):
+        """Summarize the outcome of the game as plain data"""
+        # Sort participants by votes received
+        sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
+        most_votes = sorted_participants[0].votes
+        most_voted = [p for p in sorted_participants if p.votes == most_votes]
+        names = {p.id: p.name for p in self.participants}
+        
+        return {
+            "human": self.human_participant.name,
+            "participants": [p.name for p in self.participants],
+            "votes": {p.name: p.votes for p in self.participants},
+            "ballots": [{"voter": names[voter], "voted": names[voted]} for voter, voted in self.ballots],
+            "most_voted": [p.name for p in most_voted],
+            "tie": len(most_voted) > 1,
+            "suspected": self.human_participant in most_voted,
+            "detected": most_voted == [self.human_participant],
+            "turns": self.turn_counter,
+            "messages": len(self.chat_history),
+            "skipped_turns": self.scheduler.skipped,
+            "reply_validation": dict(self.validator.stats),
+            "prompt_tokens": self.compactor.report(),
+            "suspicion": {names[participant_id]: round(suspicion, 3)
+                          for participant_id, (_, suspicion) in self.suspicion.scores(self.participants).items()},
+            "agents": {agent.participant.name: agent.stats() for agent in self.agents.values()},
+        }
     
     def show_results(self):
         """Display the game results"""
-        print(f"\n{Fore.CYAN}=== GAME RESULTS ==={Style.RESET_ALL}")
+        self.log(f"\n{Fore.CYAN}=== GAME RESULTS ==={Style.RESET_ALL}")
         
         # Sort participants by votes received
         sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
         
-        print(f"\n{Fore.CYAN}Vote Tally:{Style.RESET_ALL}")
+        self.log(f"\n{Fore.CYAN}Vote Tally:{Style.RESET_ALL}")
         for participant in sorted_participants:
             status = f"{Fore.RED}(HUMAN)" if participant.is_human else f"{Fore.GREEN}(AI)"
-            print(f"{participant.color}{participant.name} {status}: {participant.votes} votes{Style.RESET_ALL}")
+            self.log(f"{participant.color}{participant.name} {status}: {participant.votes} votes{Style.RESET_ALL}")
         
         # Determine if the human was caught
         most_votes = sorted_participants[0].votes
@@ -362,22 +874,24 @@ class ReverseGame:
         
         if self.human_participant in most_voted:
             if len(most_voted) == 1:
-                print(f"\n{Fore.RED}You were identified as the human!{Style.RESET_ALL}")
-                print(f"{Fore.RED}The AI models successfully detected you.{Style.RESET_ALL}")
+                self.log(f"\n{Fore.RED}You were identified as the human!{Style.RESET_ALL}")
+                self.log(f"{Fore.RED}The AI models successfully detected you.{Style.RESET_ALL}")
             else:
-                print(f"\n{Fore.YELLOW}There was a tie in the voting.{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}You were among those suspected to be human.{Style.RESET_ALL}")
+                self.log(f"\n{Fore.YELLOW}There was a tie in the voting.{Style.RESET_ALL}")
+                self.log(f"{Fore.YELLOW}You were among those suspected to be human.{Style.RESET_ALL}")
         else:
-            print(f"\n{Fore.GREEN}Success! You weren't identified as the human!{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}You successfully convinced the AI models that you're an AI.{Style.RESET_ALL}")
+            self.log(f"\n{Fore.GREEN}Success! You weren't identified as the human!{Style.RESET_ALL}")
+            self.log(f"{Fore.GREEN}You successfully convinced the AI models that you're an AI.{Style.RESET_ALL}")
         
         # Show which AI received the most votes if not the human
         if not self.human_participant in most_voted:
             for p in most_voted:
-                print(f"{Fore.CYAN}{p.name} (AI) received the most votes.{Style.RESET_ALL}")
+                self.log(f"{Fore.CYAN}{p.name} (AI) received the most votes.{Style.RESET_ALL}")
         
         # Save game transcript
-        self.save_transcript()
+        if self.should_save_transcript:
+            with self.profiler.phase("transcript"):
+                self.save_transcript()
     
     def save_transcript(self):
         """Save the chat transcript to a file"""
@@ -388,7 +902,8 @@ class ReverseGame:
             with open(filename, "w", encoding="utf-8") as f:
                 f.write("=== REVERSE TURING TEST GAME TRANSCRIPT ===\n\n")
                 f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Human was {self.human_participant.name}\n\n")
+                f.write(f"Human was {self.human_participant.name}\n")
+                f.write(f"Seed: {self.seed}\n\n")
                 
                 f.write("=== PARTICIPANTS ===\n\n")
                 for participant in self.participants:
@@ -397,9 +912,9 @@ class ReverseGame:
                 
                 f.write("\n=== CHAT HISTORY ===\n\n")
                 for entry in self.chat_history:
-                    participant = next((p for p in self.participants if p.id == entry['participant_id']), None)
-                    is_human = "(HUMAN)" if participant and participant.is_human else "(AI)"
-                    f.write(f"[{entry['timestamp']}] {participant.name} {is_human}: {entry['message']}\n")
+                    participant = self.participants[entry.participant_index]
+                    is_human = "(HUMAN)" if participant.is_human else "(AI)"
+                    f.write(f"[{self.chat_history.format_time(entry.created)}] {participant.name} {is_human}: {entry.text}\n")
                 
                 f.write("\n=== VOTING RESULTS ===\n\n")
                 sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
@@ -407,43 +922,74 @@ class ReverseGame:
                     status = "(HUMAN)" if participant.is_human else "(AI)"
                     f.write(f"{participant.name} {status}: {participant.votes} votes\n")
             
-            print(f"\n{Fore.CYAN}Game transcript saved to {filename}{Style.RESET_ALL}")
+            # Structured copy for replays and analysis
+            save_json_transcript(filename[:-len(".txt")] + ".json", self.participants, self.chat_history,
+                                 self.model_name, self.ballots, seed=self.seed)
+            
+            self.log(f"\n{Fore.CYAN}Game transcript saved to {filename}{Style.RESET_ALL}")
         except Exception as e:
-            print(f"\n{Fore.RED}Error saving transcript: {str(e)}{Style.RESET_ALL}")
+            self.log(f"\n{Fore.RED}Error saving transcript: {str(e)}{Style.RESET_ALL}")
 
 def main():
+    startup = StartupTimer()
+    startup.mark("imports")
+    parser = argparse.ArgumentParser(description="Play the Reverse Turing Test game in the terminal.")
+    parser.add_argument("--realtime", action="store_true", default=REALTIME_CLI,
+                        help="keep the chat flowing while you type instead of taking turns")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every game phase and write a profile report when the game ends")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES, default="phases",
+                        help="also run cProfile or a sampling profiler for the whole game")
+    parser.add_argument("--checkpoint", nargs="?", const=CHECKPOINT_FILE, metavar="FILE",
+                        help=f"save the game every {CHECKPOINT_INTERVAL} seconds so it can be resumed (default file: {CHECKPOINT_FILE})")
+    parser.add_argument("--resume", metavar="FILE", help="continue a game from a checkpoint file")
+    parser.add_argument("--seed", type=int, help="play the game with this seed, e.g. one from a saved transcript")
+    parser.add_argument("--startup-report", action="store_true", default=STARTUP_REPORT,
+                        help="print how long each startup step took")
+    args = parser.parse_args()
+    
+    # Check that Ollama is running and has every model used by the game phases,
+    # in the background while the game is set up
+    preflight = Preflight(LatencyController(ModelRouter()).models()).start()
+    
     print(f"{Fore.CYAN}=== REVERSE TURING TEST GAME ==={Style.RESET_ALL}")
     print(f"{Fore.CYAN}In this game, you'll chat with {NUM_AI_PARTICIPANTS} AI models and try to convince them that you're also an AI.{Style.RESET_ALL}")
     print(f"{Fore.CYAN}After the chat, everyone will vote on who they think is the human.{Style.RESET_ALL}\n")
     
-    # Check if Ollama is running
-    try:
-        response = requests.get("http://localhost:11434/api/tags")
-        if response.status_code != 200:
-            print(f"{Fore.RED}Error: Ollama API is not responding. Make sure Ollama is running.{Style.RESET_ALL}")
-            return
-    except requests.exceptions.ConnectionError:
-        print(f"{Fore.RED}Error: Could not connect to Ollama API. Make sure Ollama is running on http://localhost:11434{Style.RESET_ALL}")
-        return
-    
-    # Check if the model is available
+    # Start the game
+    profiler = PhaseProfiler(enabled=args.profile, mode=args.profile_mode)
+    profiler.start()
+    game = None
     try:
-        response = requests.get("http://localhost:11434/api/tags")
-        models = response.json().get("models", [])
-        model_names = [model.get("name", "").lower() for model in models]
-        
-        if MODEL_NAME.lower() not in model_names and MODEL_NAME.split(':')[0].lower() not in model_names:
-            print(f"{Fore.RED}Error: Model '{MODEL_NAME}' not found in Ollama.{Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}Available models: {', '.join(model_names)}{Style.RESET_ALL}")
-            print(f"{Fore.YELLOW}Please install the model with: ollama pull {MODEL_NAME}{Style.RESET_ALL}")
+        if args.resume:
+            game = ReverseGame.restore(read_checkpoint(args.resume), realtime=args.realtime, profiler=profiler,
+                                       checkpoint_file=args.checkpoint or args.resume)
+        else:
+            game = ReverseGame(realtime=args.realtime, profiler=profiler, checkpoint_file=args.checkpoint, seed=args.seed)
+        startup.mark("setup")
+        problems = preflight.wait()
+        startup.mark("server check")
+        if args.startup_report:
+            print(f"{Fore.CYAN}{startup.report(preflight)}{Style.RESET_ALL}")
+        for level, text in problems:
+            color = Fore.RED if level == "error" else Fore.YELLOW
+            print(f"{color}{'Error: ' if level == 'error' else ''}{text}{Style.RESET_ALL}")
+        if preflight.failed():
             return
-    except Exception as e:
-        print(f"{Fore.RED}Error checking available models: {str(e)}{Style.RESET_ALL}")
-        return
-    
-    # Start the game
-    game = ReverseGame()
-    game.run_game()
+        game.router.skip_models(preflight.missing)
+        game.run_game()
+    except KeyboardInterrupt:
+        if game is not None and game.checkpoint_file is not None:
+            game.checkpoint(force=True)
+            print(f"\n{Fore.YELLOW}Game saved. Continue it with: python reverse_turing_test.py --resume {game.checkpoint_file}{Style.RESET_ALL}")
+        raise
+    finally:
+        if args.profile:
+            profiler.stop()
+            filenames = profiler.write(f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            print(f"\n{Fore.CYAN}=== PROFILE ==={Style.RESET_ALL}")
+            print(profiler.summary())
+            print(f"{Fore.CYAN}Profile written to {', '.join(filenames)}{Style.RESET_ALL}")
 
 if __name__ == "__main__":
     try:
@@ -1,25 +1,44 @@
 #!/usr/bin/env python3
+from startup import StartupTimer, Preflight  # First, so the startup report covers the other imports
 import customtkinter as ctk
+import argparse
 import random
 import time
 import json
-import requests
 import threading
 from datetime import datetime
-from PIL import Image, ImageDraw
 import os
+import uuid
+from array import array
 from config import *
+from pacing import Pacer
+from ollama_client import OllamaClient, CancelToken
+from chat_log import ChatLog
+from transcripts import save_json_transcript
+from retrieval import HistoryIndex
+from model_routing import ModelRouter
+from slo import LatencyController
+from rooms import is_large_room, participant_names, SpeakerSelector
+from scheduler import TurnScheduler, Turn
+from validation import ReplyValidator
+from game_flow import GameFlow, vote_message
+from game_state import (STATE_VERSION, encode_rng_state, decode_rng_state, participant_state, restore_participant,
+                        agent_state, restore_agent, scheduler_state, restore_scheduler, write_checkpoint,
+                        read_checkpoint)
 
 # Constants
 TOTAL_PARTICIPANTS = NUM_AI_PARTICIPANTS + 1  # +1 for the human
 
 class Participant:
+    __slots__ = ("id", "is_human", "messages", "votes", "model_instance", "personality", "name")
+    
     def __init__(self, id, is_human=False):
         self.id = id
         self.is_human = is_human
-        self.messages = []
+        self.messages = array("I")  # Indices of this participant's messages in the chat log
         self.votes = 0
         self.model_instance = None  # Will hold a unique model identifier
+        self.personality = None
         
         # Assign a random name if enabled
         if USE_RANDOM_NAMES:
@@ -127,8 +146,11 @@ class ChatBubble(ctk.CTkFrame):
         )
 
 class ChatUI(ctk.CTk):
-    def __init__(self):
+    def __init__(self, checkpoint_file=None, resume_state=None, preflight=None, startup=None, startup_report=False):
         super().__init__()
+        self.preflight = preflight
+        self.startup = startup
+        self.startup_report = startup_report
         
         # Configure window
         self.title("Reverse Turing Test Game")
@@ -139,15 +161,51 @@ class ChatUI(ctk.CTk):
         self.grid_columnconfigure(0, weight=1)
         
         # Create game instance
-        self.game = ReverseGameGUI(self)
+        self.game = ReverseGameGUI(self, checkpoint_file)
         
         # Create UI elements
         self.create_header()
         self.create_chat_area()
         self.create_input_area()
         
-        # Start game
-        self.after(100, self.game.start_game)
+        if self.startup is not None:
+            self.startup.mark("window")
+        
+        # Start game, or continue the one from the checkpoint
+        self.after(100, lambda: self.begin(resume_state))
+        
+        # Abort pending generations when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def on_close(self):
+        self.game.shutdown()
+        self.destroy()
+    
+    def begin(self, resume_state):
+        """Start the game, or continue the one from the checkpoint, once the server check passed"""
+        if self.preflight is not None:
+            # Poll so the window stays responsive while the check finishes
+            if not self.preflight.done():
+                self.after(50, lambda: self.begin(resume_state))
+                return
+            if self.startup is not None:
+                self.startup.mark("server check")
+            for _, text in self.preflight.problems:
+                self.add_message(text, "System")
+            if self.preflight.failed():
+                self.game.shutdown()
+                self.input_field.configure(state="disabled")
+                return
+            self.game.router.skip_models(self.preflight.missing)
+        
+        if resume_state is None:
+            self.game.start_game()
+        else:
+            self.game.resume_game(resume_state)
+        if self.startup is not None:
+            self.startup.mark("setup")
+            if self.startup_report:
+                print(self.startup.report(self.preflight))
     
     def create_header(self):
         # Header frame
@@ -307,14 +365,38 @@ class ChatUI(ctk.CTk):
             command=dialog.destroy
         ).pack(pady=10)
 
-class ReverseGameGUI:
-    def __init__(self, ui):
+class ReverseGameGUI(GameFlow):
+    def __init__(self, ui, checkpoint_file=None):
         self.ui = ui
+        self.game_id = uuid.uuid4().hex
         self.participants = []
+        self.agents = {}  # Participant id -> Agent, for the AI participants
         self.human_participant = None
-        self.chat_history = []
+        self.chat_history = ChatLog()
+        self.history_index = HistoryIndex()
+        self.ballots = []
         self.game_over = False
         self.turn_counter = 0
+        self.pacer = Pacer()
+        self.client = OllamaClient()
+        self.router = LatencyController(ModelRouter(), enabled=SLO_ENABLED)
+        self.rng = random  # The module's generator, whose state checkpoints save
+        
+        # In large rooms only a few AIs speak per round instead of everyone in turn
+        self.speakers = SpeakerSelector(self.participants) if is_large_room(TOTAL_PARTICIPANTS) else None
+        self.scheduler = TurnScheduler(self.participants, self.chat_history, speakers=self.speakers)
+        self.validator = ReplyValidator(self.participants)  # Keeps failed and malformed replies out of the chat
+        
+        # Discussion generations are aborted at the chat deadline, votes only when the window closes
+        self.chat_token = None
+        self.vote_token = CancelToken()
+        
+        # Periodic snapshots of the game, so it can be resumed after a crash or restart
+        self.phase = "introductions"
+        self.start_time = None
+        self.waiting_for_human = False
+        self.checkpoint_file = checkpoint_file
+        self.last_checkpoint = time.monotonic()
     
     def start_game(self):
         # Initialize participants
@@ -322,6 +404,7 @@ class ReverseGameGUI:
         
         # Start timer
         self.start_time = time.time()
+        self.chat_token = CancelToken(deadline=self.start_time + CHAT_DURATION_MINUTES * 60)
         self.update_timer()
         
         # Start introduction round
@@ -352,7 +435,7 @@ class ReverseGameGUI:
         human_id = random.randint(1, TOTAL_PARTICIPANTS)
         
         # Select random names
-        selected_names = random.sample(PARTICIPANT_NAMES, TOTAL_PARTICIPANTS)
+        selected_names = participant_names(TOTAL_PARTICIPANTS)
         
         # Create participants
         for i in range(1, TOTAL_PARTICIPANTS + 1):
@@ -360,14 +443,17 @@ class ReverseGameGUI:
             participant = Participant(i, is_human)
             participant.name = selected_names[i-1]
             
-            # Assign a unique model instance identifier for each AI
+            # Assign a unique model instance identifier and a personality for each AI
             if not is_human:
                 # Create a unique identifier for this AI's model instance
                 participant.model_instance = f"ai_instance_{i}"
+                participant.personality = PERSONALITY_TRAITS[(i - 1) % len(PERSONALITY_TRAITS)]
             
             self.participants.append(participant)
             if is_human:
                 self.human_participant = participant
+        
+        self.create_agents()
     
     def update_timer(self):
         if not self.game_over:
@@ -380,17 +466,14 @@ class ReverseGameGUI:
                 minutes = int(remaining // 60)
                 seconds = int(remaining % 60)
                 self.ui.update_timer(minutes, seconds)
+                self.checkpoint()
                 self.ui.after(1000, self.update_timer)
     
     def handle_human_message(self, message):
         if not self.game_over and self.waiting_for_human:
             self.waiting_for_human = False
             self.ui.add_message(message, self.human_participant.name, is_user=True)
-            self.chat_history.append({
-                "participant_id": self.human_participant.id,
-                "message": message,
-                "timestamp": datetime.now().strftime("%H:%M:%S")
-            })
+            self.record_message(self.human_participant, message)
             
             # If this is the introduction, start the main discussion
             if self.turn_counter == 0:
@@ -404,24 +487,32 @@ class ReverseGameGUI:
     
     def _run_ai_introductions(self):
         for participant in self.participants:
-            if not participant.is_human:
-                message = self.generate_ai_message(participant, "Introduce yourself briefly to the group. Don't reveal that you're an AI.")
+            if not participant.is_human and not participant.messages:
+                generated = self.generate_turn(Turn(participant, "intro"))
+                if generated is None:
+                    return
+                message, delay = generated
                 # Use after() to safely update GUI from a background thread
                 self.ui.after(0, lambda p=participant, m=message: self._add_ai_message(p, m))
-                time.sleep(random.uniform(MIN_RESPONSE_DELAY, MAX_RESPONSE_DELAY))
+                time.sleep(delay)
         
         # Start main discussion
         self.ui.after(1000, self.start_main_discussion)
     
     def _add_ai_message(self, participant, message):
+        if self.game_over:
+            return
         self.ui.add_message(message, participant.name)
-        self.chat_history.append({
-            "participant_id": participant.id,
-            "message": message,
-            "timestamp": datetime.now().strftime("%H:%M:%S")
-        })
+        self.record_message(participant, message)
+    
+    def record_message(self, participant, message):
+        """Add a message to the chat history"""
+        index = self.add_to_history(participant, message)
+        if RETRIEVAL_ENABLED:
+            self.history_index.add(index, message)
     
     def start_main_discussion(self):
+        self.phase = "discussion"
         self.ui.add_message(
             "Let's begin the main discussion. Remember to keep your responses concise!",
             "System"
@@ -431,169 +522,46 @@ class ReverseGameGUI:
     def continue_discussion(self):
         if self.game_over:
             return
-        
-        self.turn_counter += 1
-        current_participant_idx = (self.turn_counter - 1) % TOTAL_PARTICIPANTS
-        current_participant = self.participants[current_participant_idx]
-        
-        if current_participant.is_human:
+        self.play_turn(self.next_turn())
+    
+    def play_turn(self, turn):
+        if self.game_over:
+            return
+        if turn.speaker.is_human:
             self.waiting_for_human = True
             self.ui.input_field.configure(state="normal")
         else:
             # AI turn - run in background thread
-            threading.Thread(
-                target=self._run_ai_turn,
-                args=(current_participant,),
-                daemon=True
-            ).start()
-    
-    def _run_ai_turn(self, current_participant):
-        # AI turn
-        if self.turn_counter > 2 and self.turn_counter % DIRECT_QUESTION_FREQUENCY == 0:
-            # Generate a question for another participant
-            target_participant = random.choice([p for p in self.participants if p.id != current_participant.id])
-            self._run_ai_question(current_participant, target_participant)
-        else:
-            # Regular turn
-            message = self.generate_ai_message(current_participant, "Continue the conversation naturally.")
-            # Use after() to safely update GUI from a background thread
-            self.ui.after(0, lambda p=current_participant, m=message: self._add_ai_message(p, m))
-            
-            # Schedule next turn
-            delay = int(random.uniform(MIN_RESPONSE_DELAY, MAX_RESPONSE_DELAY) * 1000)
-            self.ui.after(delay, self.continue_discussion)
-    
-    def generate_ai_message(self, participant, prompt):
-        try:
-            # Prepare the system prompt with unique personality traits based on participant ID
-            personality_traits = [
-                "You are analytical and logical in your responses.",
-                "You are friendly and empathetic in your communication style.",
-                "You are curious and inquisitive, often asking thoughtful questions.",
-                "You are straightforward and concise in your messages.",
-                "You are slightly humorous but still professional."
-            ]
-            
-            # Select a personality trait based on participant ID to ensure consistency
-            personality_index = hash(participant.model_instance) % len(personality_traits)
-            personality = personality_traits[personality_index]
-            
-            system_prompt = (
-                f"You are {participant.name} in a group chat with {TOTAL_PARTICIPANTS} participants. "
-                f"The other participants are: {', '.join([p.name for p in self.participants if p.id != participant.id])}. "
-                f"You are an AI assistant based on Llama 3.1. {personality} "
-                f"Keep your responses VERY concise (1-2 short sentences). "
-                f"Your responses should be under 150 characters whenever possible. "
-                f"You can ask questions to other participants by addressing them by their name. "
-                f"You are trying to determine which participant is a human pretending to be an AI. "
-                f"Be conversational but brief in your responses."
-            )
-            
-            # Prepare the full prompt with chat history
-            chat_history = self.format_chat_history()
-            full_prompt = f"{system_prompt}\n\nChat history:\n{chat_history}\n\n{prompt}"
-            
-            # Make API request to Ollama with a unique model instance identifier
-            response = requests.post(
-                OLLAMA_API_URL,
-                json={
-                    "model": MODEL_NAME,
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "options": {
-                        "num_ctx": 2048,  # Ensure enough context
-                        "seed": hash(participant.model_instance) % 2147483647  # Use a consistent seed for this AI
-                    }
-                }
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                message = result.get("response", "").strip()
-                
-                # Truncate if too long
-                if len(message) > MAX_AI_RESPONSE_LENGTH:
-                    message = message[:MAX_AI_RESPONSE_LENGTH] + "..."
-                
-                return message
-            else:
-                return f"[Error generating response: {response.status_code}]"
-        except Exception as e:
-            return f"[Error: {str(e)}]"
-    
-    def format_chat_history(self):
-        formatted = ""
-        for entry in self.chat_history[-10:]:  # Only show last 10 messages for context
-            participant = next((p for p in self.participants if p.id == entry['participant_id']), None)
-            if participant:
-                formatted += f"{participant.name}: {entry['message']}\n"
-        return formatted
-    
-    def _run_ai_question(self, from_participant, to_participant):
-        # Each AI should only generate its own messages
-        prompt = (
-            f"Ask a direct question to {to_participant.name} that might help reveal "
-            f"whether they are a human pretending to be an AI. Make your question challenging but natural and VERY brief."
-        )
-        
-        # Generate the question from the asking AI's perspective
-        question = self.generate_ai_message(from_participant, prompt)
-        
-        # Make sure the question includes the target's name
-        if to_participant.name not in question:
-            question = f"{to_participant.name}, {question}"
-        
-        # Use after() to safely update GUI from a background thread
-        self.ui.after(0, lambda: self._add_ai_question(from_participant, to_participant, question))
-    
-    def _add_ai_question(self, from_participant, to_participant, question):
-        # Add the question to the chat
-        self.ui.add_message(question, from_participant.name)
-        self.chat_history.append({
-            "participant_id": from_participant.id,
-            "message": question,
-            "timestamp": datetime.now().strftime("%H:%M:%S")
-        })
-        
-        # If target is AI, let that AI generate its own response
-        if not to_participant.is_human:
-            delay = int(random.uniform(MIN_RESPONSE_DELAY, MAX_RESPONSE_DELAY) * 1000)
-            self.ui.after(delay, lambda: self._run_ai_response(to_participant))
-        else:
-            self.waiting_for_human = True
-            self.ui.input_field.configure(state="normal")
-    
-    def _run_ai_response(self, ai_participant):
-        # Run in background thread
-        threading.Thread(
-            target=self._generate_and_add_response,
-            args=(ai_participant,),
-            daemon=True
-        ).start()
+            threading.Thread(target=self._run_ai_turn, args=(turn,), daemon=True).start()
     
-    def _generate_and_add_response(self, ai_participant):
-        # Let the AI generate its own response to the question
-        prompt = "Respond to the previous question directed at you. Keep your response brief and natural."
-        message = self.generate_ai_message(ai_participant, prompt)
-        
+    def _run_ai_turn(self, turn):
+        generated = self.generate_turn(turn)
+        if generated is None:
+            return
+        message, delay = generated
         # Use after() to safely update GUI from a background thread
-        self.ui.after(0, lambda p=ai_participant, m=message: self._add_ai_message(p, m))
+        self.ui.after(0, lambda: self._add_ai_message(turn.speaker, message))
         
-        # Continue discussion
-        self.ui.after(1000, self.continue_discussion)
+        # Schedule the next turn once the rest of the typing time has passed; a human can answer right away
+        follow_up = self.follow_up(turn)
+        if follow_up is None:
+            self.ui.after(int(delay * 1000), self.continue_discussion)
+        else:
+            self.ui.after(0 if follow_up.speaker.is_human else int(delay * 1000), lambda: self.play_turn(follow_up))
     
     def end_game(self):
-        self.game_over = True
+        voters = self.close_chat()
+        self.phase = "voting"
         self.ui.input_field.configure(state="disabled")
+        self.checkpoint(force=True)
         
         # Show voting dialog
         self.ui.add_message("=== VOTING PHASE ===", "System")
         self.ui.add_message("Each participant will now vote on who they think is the human.", "System")
         
-        # AI participants vote
-        for participant in self.participants:
-            if not participant.is_human:
-                self.handle_ai_vote(participant)
+        # AI participants vote, unless they did before the game was restored
+        for participant in voters:
+            self.handle_ai_vote(participant)
         
         # Show voting dialog for human
         self.ui.after(1000, lambda: self.ui.show_voting_dialog(self.participants))
@@ -608,43 +576,107 @@ class ReverseGameGUI:
     
     def _generate_and_process_vote(self, voting_participant):
         # Each AI generates its own vote
-        prompt = (
-            f"Based on the conversation, which participant do you think is the human? "
-            f"Respond with just the name and a brief explanation why."
-        )
-        
-        vote_response = self.generate_ai_message(voting_participant, prompt)
-        
-        # Extract the vote (first name mentioned that matches a participant)
-        vote_name = None
-        for participant in self.participants:
-            if participant.name in vote_response and participant.id != voting_participant.id:
-                vote_name = participant.name
-                voted_participant = participant
-                break
-        
-        # If no valid name found, choose randomly (but not self)
-        if not vote_name:
-            other_participants = [p for p in self.participants if p.id != voting_participant.id]
-            voted_participant = random.choice(other_participants)
-            vote_name = voted_participant.name
-        
-        # Increment votes
-        voted_participant.votes += 1
+        vote = self.cast_vote(voting_participant)
+        if vote is None:
+            return
         
         # Display the vote - use after() to safely update GUI from a background thread
-        self.ui.after(0, lambda vp=voting_participant, vr=vote_response, vn=vote_name: 
-            self.ui.add_message(f"I vote that {vn} is the human because: {vr}", vp.name))
+        self.ui.after(0, lambda: self.ui.add_message(vote_message(*vote), voting_participant.name))
     
     def handle_human_vote(self, voted_participant):
         voted_participant.votes += 1
+        self.ballots.append((self.human_participant.id, voted_participant.id))
+        self.phase = "finished"
         self.show_results()
+        
+        # The transcript takes over from the checkpoint once the game is over
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+    
+    def snapshot(self):
+        """Return the full game state as JSON-serializable data"""
+        remaining = CHAT_DURATION_MINUTES * 60
+        if self.start_time is not None:
+            remaining = max(0.0, remaining - (time.time() - self.start_time))
+        return {
+            "version": STATE_VERSION,
+            "game_id": self.game_id,
+            "phase": self.phase,
+            "remaining": remaining,
+            "turn_counter": self.turn_counter,
+            "waiting_for_human": self.waiting_for_human,
+            "participants": [participant_state(p) for p in self.participants],
+            "chat_history": self.chat_history.to_state(),
+            "ballots": self.ballots,
+            "rng": encode_rng_state(random.getstate()),
+            "agents": {str(participant_id): agent_state(agent) for participant_id, agent in self.agents.items()},
+            "latency_level": self.router.level,
+            "scheduler": scheduler_state(self.scheduler),
+        }
+    
+    def checkpoint(self, force=False):
+        """Write a snapshot to the checkpoint file if one is set and the interval has passed"""
+        if self.checkpoint_file is None or self.phase == "finished":
+            return
+        if not force and time.monotonic() - self.last_checkpoint < CHECKPOINT_INTERVAL:
+            return
+        try:
+            write_checkpoint(self.checkpoint_file, self.snapshot())
+            self.last_checkpoint = time.monotonic()
+        except OSError as e:
+            print(f"Error writing checkpoint: {str(e)}")
+    
+    def resume_game(self, state):
+        """Continue a game from a snapshot instead of starting a new one"""
+        self.game_id = state["game_id"]
+        for saved in state["participants"]:
+            participant = Participant(saved["id"], saved["is_human"])
+            restore_participant(participant, saved)
+            if not participant.is_human:
+                participant.model_instance = f"ai_instance_{participant.id}"
+            self.participants.append(participant)
+            if participant.is_human:
+                self.human_participant = participant
+        self.create_agents()
+        for participant_id, saved in state["agents"].items():
+            restore_agent(self.agents[int(participant_id)], saved)
+        
+        self.chat_history = ChatLog.from_state(state["chat_history"])
+        for entry in self.chat_history:
+            participant = self.participants[entry.participant_index]
+            participant.messages.append(entry.index)
+            if RETRIEVAL_ENABLED:
+                self.history_index.add(entry.index, entry.text)
+            self.ui.add_message(entry.text, participant.name, is_user=participant.is_human)
+        
+        self.ballots = [tuple(ballot) for ballot in state["ballots"]]
+        self.turn_counter = state["turn_counter"]
+        self.phase = state["phase"]
+        self.router.level = state["latency_level"]
+        random.setstate(decode_rng_state(state["rng"]))
+        self.scheduler = TurnScheduler(self.participants, self.chat_history, speakers=self.speakers, position=self.turn_counter)
+        if "scheduler" in state:
+            restore_scheduler(self.scheduler, state["scheduler"])
+        
+        # Only the time that was left counts
+        self.start_time = time.time() - (CHAT_DURATION_MINUTES * 60 - state["remaining"])
+        self.chat_token = CancelToken(deadline=self.start_time + CHAT_DURATION_MINUTES * 60)
+        self.ui.add_message(f"Game resumed. You are {self.human_participant.name}.", "System")
+        
+        if self.phase == "voting" or state["remaining"] <= 0:
+            self.end_game()
+            return
+        self.update_timer()
+        if state["waiting_for_human"] or not self.human_participant.messages:
+            self.waiting_for_human = True
+            self.ui.input_field.configure(state="normal")
+        elif self.phase == "introductions":
+            self.start_ai_introductions()
+        else:
+            self.continue_discussion()
     
     def show_results(self):
-        # Sort participants by votes
-        sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
-        
-        # Prepare results data
+        sorted_participants, result_message = self.results()
         results_data = {
             "vote_tally": [
                 {
@@ -653,21 +685,10 @@ class ReverseGameGUI:
                     "is_human": p.is_human
                 }
                 for p in sorted_participants
-            ]
+            ],
+            "result_message": result_message,
         }
         
-        # Determine if human was caught
-        most_votes = sorted_participants[0].votes
-        most_voted = [p for p in sorted_participants if p.votes == most_votes]
-        
-        if self.human_participant in most_voted:
-            if len(most_voted) == 1:
-                results_data["result_message"] = "You were identified as the human! The AI models successfully detected you."
-            else:
-                results_data["result_message"] = "There was a tie in the voting. You were among those suspected to be human."
-        else:
-            results_data["result_message"] = "Success! You weren't identified as the human! You successfully convinced the AI models that you're an AI."
-        
         # Show results dialog
         self.ui.show_results(results_data)
         
@@ -691,9 +712,9 @@ class ReverseGameGUI:
                 
                 f.write("\n=== CHAT HISTORY ===\n\n")
                 for entry in self.chat_history:
-                    participant = next((p for p in self.participants if p.id == entry['participant_id']), None)
-                    is_human = "(HUMAN)" if participant and participant.is_human else "(AI)"
-                    f.write(f"[{entry['timestamp']}] {participant.name} {is_human}: {entry['message']}\n")
+                    participant = self.participants[entry.participant_index]
+                    is_human = "(HUMAN)" if participant.is_human else "(AI)"
+                    f.write(f"[{self.chat_history.format_time(entry.created)}] {participant.name} {is_human}: {entry.text}\n")
                 
                 f.write("\n=== VOTING RESULTS ===\n\n")
                 sorted_participants = sorted(self.participants, key=lambda p: p.votes, reverse=True)
@@ -701,15 +722,34 @@ class ReverseGameGUI:
                     status = "(HUMAN)" if participant.is_human else "(AI)"
                     f.write(f"{participant.name} {status}: {participant.votes} votes\n")
             
+            # Structured copy for replays and analysis
+            save_json_transcript(filename[:-len(".txt")] + ".json", self.participants, self.chat_history,
+                                 MODEL_NAME, self.ballots)
+            
             self.ui.add_message(f"Game transcript saved to {filename}", "System")
         except Exception as e:
             self.ui.add_message(f"Error saving transcript: {str(e)}", "System")
 
 if __name__ == "__main__":
+    startup = StartupTimer()
+    startup.mark("imports")
+    parser = argparse.ArgumentParser(description="Play the Reverse Turing Test game in a window.")
+    parser.add_argument("--checkpoint", nargs="?", const=CHECKPOINT_FILE, metavar="FILE",
+                        help=f"save the game every {CHECKPOINT_INTERVAL} seconds so it can be resumed (default file: {CHECKPOINT_FILE})")
+    parser.add_argument("--resume", metavar="FILE", help="continue a game from a checkpoint file")
+    parser.add_argument("--startup-report", action="store_true", default=STARTUP_REPORT,
+                        help="print how long each startup step took")
+    args = parser.parse_args()
+    
+    # Check the server and models in the background while the window is built
+    preflight = Preflight(LatencyController(ModelRouter()).models()).start()
+    
     # Set appearance mode and default color theme
     ctk.set_appearance_mode("dark")
     ctk.set_default_color_theme("blue")
     
     # Create and run the app
-    app = ChatUI()
+    resume_state = read_checkpoint(args.resume) if args.resume else None
+    app = ChatUI(checkpoint_file=args.checkpoint or args.resume, resume_state=resume_state,
+                 preflight=preflight, startup=startup, startup_report=args.startup_report)
     app.mainloop() 
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""Support for rooms with dozens of participants.
+
+Rooms larger than LARGE_ROOM_THRESHOLD are played in large-room mode: names beyond
+PARTICIPANT_NAMES and terminal colors beyond the five base colors are generated, only a
+few AIs speak per round, and prompts list a limited number of names and messages so
+their size doesn't grow with the room.
+"""
+import random
+
+from config import *
+
+# Name parts for generated names; every generated name is checked against the others
+# so that no name contains another, which would confuse vote parsing
+ONSETS = ["B", "D", "F", "G", "K", "L", "M", "N", "P", "R", "S", "T", "V", "Z",
+          "Br", "Cl", "Dr", "Fl", "Gr", "Kr", "St", "Tr"]
+VOWELS = ["a", "e", "i", "o", "u", "ay", "ee", "io"]
+CODAS = ["", "n", "r", "l", "s", "x", "th", "nd"]
+
+def is_large_room(total_participants):
+    return total_participants > LARGE_ROOM_THRESHOLD
+
+def _conflicts(name, names):
+    lowered = name.lower()
+    return any(lowered in other.lower() or other.lower() in lowered for other in names)
+
+def participant_names(count, rng=None):
+    """Pick count distinct names from PARTICIPANT_NAMES, generating more if the room needs them"""
+    rng = rng or random.Random()
+    names = rng.sample(PARTICIPANT_NAMES, min(count, len(PARTICIPANT_NAMES)))
+    while len(names) < count:
+        name = rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(ONSETS).lower() + rng.choice(VOWELS) + rng.choice(CODAS)
+        if not _conflicts(name, names):
+            names.append(name)
+    return names
+
+def _generated_palette():
+    """Readable colors from the 256-color terminal cube, ordered so neighbours differ"""
+    codes = [16 + 36 * r + 6 * g + b
+             for r in range(6) for g in range(6) for b in range(6)
+             if r + g + b >= 5 and max(r, g, b) >= 3]
+    stride = 37  # Coprime with the palette size, so every color is used once per cycle
+    while len(codes) % stride == 0:
+        stride += 2
+    return [f"\033[38;5;{codes[(i * stride) % len(codes)]}m" for i in range(len(codes))]
+
+GENERATED_COLORS = _generated_palette()
+
+def terminal_color(index, base_colors):
+    """Return the color for the participant at index, after the base colors are used up"""
+    if index < len(base_colors):
+        return base_colors[index]
+    return GENERATED_COLORS[(index - len(base_colors)) % len(GENERATED_COLORS)]
+
+class SpeakerSelector:
+    """Picks who speaks in each round of a large room
+
+    Every round the AIs that have been quiet the longest get to speak, up to
+    speakers_per_round of them, together with the human if they take part in the
+    rotation. Who spoke last is read from the chat log, so the selector needs no state
+    of its own beyond the current round, which is saved in checkpoints.
+    """
+    def __init__(self, participants, speakers_per_round=LARGE_ROOM_SPEAKERS_PER_ROUND,
+                 include_human=True, rng=None):
+        self.participants = participants
+        self.speakers_per_round = speakers_per_round
+        self.include_human = include_human
+        self.rng = rng or random.Random()
+        self.round = []
+
+    def select_round(self):
+        """Return the speakers of a new round in seat order"""
+        ais = [p for p in self.participants if not p.is_human]
+        # Participants who never spoke come first; ties are broken randomly
+        self.rng.shuffle(ais)
+        ais.sort(key=lambda p: p.messages[-1] if p.messages else -1)
+        speakers = ais[:self.speakers_per_round]
+        if self.include_human:
+            speakers += [p for p in self.participants if p.is_human]
+        return sorted(speakers, key=lambda p: p.id)
+
+    def next_speaker(self):
+        if not self.round:
+            self.round = self.select_round()
+        return self.round.pop(0)
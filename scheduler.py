@@ -0,0 +1,109 @@
+"""Decides who speaks next in the discussion.
+
+Participants who were just named get the next turn, so questions are answered right
+away. Otherwise speakers come from the seat rotation (or the SpeakerSelector in large
+rooms), but an AI that has nothing new to react to passes without a model call, and
+direct questions are only asked when nobody has been addressed for a while. Who was
+named and who spoke when is read from the chat log; the rotation position and the answer
+streak are saved in checkpoints, so restored games continue with the same speakers.
+"""
+import random
+import re
+
+from config import *
+
+class Turn:
+    __slots__ = ("speaker", "phase", "target")
+
+    def __init__(self, speaker, phase="chat", target=None):
+        self.speaker = speaker
+        self.phase = phase  # "chat", "answer" when the speaker was addressed, or "question"
+        self.target = target  # Who the speaker should ask a direct question
+
+class TurnScheduler:
+    def __init__(self, participants, chat_history, include_human=True, speakers=None, rng=None, position=0):
+        self.participants = participants
+        self.chat_history = chat_history
+        self.include_human = include_human
+        self.speakers = speakers  # SpeakerSelector of a large room, if any
+        self.rng = rng or random.Random()
+        self.position = position  # Next seat in the rotation
+        self.skipped = 0  # Turns passed without calling the model
+        self.answer_streak = 0  # Answers in a row, so two AIs can't keep naming each other forever
+        self.name_pattern = None  # Built on first use, once everyone has a name
+        self.by_name = {}
+
+    def mentioned(self, entry):
+        """Return the participants named in a message, other than its author"""
+        if self.name_pattern is None:
+            names = sorted((re.escape(p.name) for p in self.participants), key=len, reverse=True)
+            self.name_pattern = re.compile(r"\b(" + "|".join(names) + r")\b", re.IGNORECASE)
+            self.by_name = {p.name.lower(): p for p in self.participants}
+        found = []
+        for match in self.name_pattern.finditer(entry.text):
+            participant = self.by_name[match.group(1).lower()]
+            if participant.id - 1 != entry.participant_index and participant not in found:
+                found.append(participant)
+        return found
+
+    def addressed(self):
+        """Participants named in the recent messages who haven't spoken since, earliest first"""
+        waiting = []
+        for entry in self.chat_history.tail(SCHEDULER_MENTION_WINDOW):
+            for participant in self.mentioned(entry):
+                if participant in waiting or (participant.is_human and not self.include_human):
+                    continue
+                if not participant.messages or participant.messages[-1] < entry.index:
+                    waiting.append(participant)
+        return waiting
+
+    def has_something_to_add(self, participant):
+        """Whether a participant who wasn't addressed should speak now"""
+        if not participant.messages:
+            return True
+        new_messages = len(self.chat_history) - 1 - participant.messages[-1]
+        if participant.is_human:
+            return new_messages > 0
+        return new_messages >= SCHEDULER_MIN_NEW_MESSAGES
+
+    def next_in_rotation(self):
+        if self.speakers is not None:
+            return self.speakers.next_speaker()
+        candidates = [p for p in self.participants if self.include_human or not p.is_human]
+        participant = candidates[self.position % len(candidates)]
+        self.position += 1
+        return participant
+
+    def should_ask(self, speaker):
+        """Ask a direct question when nobody was named in the last DIRECT_QUESTION_FREQUENCY messages"""
+        if speaker.is_human or len(self.chat_history) < len(self.participants) + 2:
+            return False
+        return not any(self.mentioned(entry) for entry in self.chat_history.tail(DIRECT_QUESTION_FREQUENCY))
+
+    def question_target(self, speaker):
+        """Pick whoever has been quiet the longest, so questions draw everyone in"""
+        others = [p for p in self.participants if p.id != speaker.id]
+        self.rng.shuffle(others)
+        return min(others, key=lambda p: p.messages[-1] if p.messages else -1)
+
+    def next_turn(self):
+        addressed = self.addressed() if self.answer_streak < SCHEDULER_MAX_ANSWER_STREAK else []
+        if addressed:
+            self.answer_streak += 1
+            return Turn(addressed[0], "answer")
+        self.answer_streak = 0
+
+        # Pass over everyone with nothing to add; if nobody has, take the next in line anyway
+        speaker = None
+        for _ in range(len(self.participants)):
+            candidate = self.next_in_rotation()
+            if self.has_something_to_add(candidate):
+                speaker = candidate
+                break
+            self.skipped += 1
+        if speaker is None:
+            speaker = self.next_in_rotation()
+
+        if self.should_ask(speaker):
+            return Turn(speaker, "question", self.question_target(speaker))
+        return Turn(speaker)
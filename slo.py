@@ -0,0 +1,80 @@
+"""Latency SLO controller.
+
+Tracks how long generations take over a rolling window and compares that to a target.
+When turns get too slow (for example because the inference box is shared with other
+work), generation settings are degraded one level at a time: a smaller context, a
+smaller token budget, and finally a fallback model. When latency drops well below the
+target again, settings are restored one level at a time.
+"""
+import logging
+import threading
+from collections import deque
+
+from config import *
+
+logger = logging.getLogger(__name__)
+
+class LatencyController:
+    def __init__(self, router, target=SLO_TARGET_SECONDS, window=SLO_WINDOW, levels=None,
+                 recovery_ratio=SLO_RECOVERY_RATIO, enabled=True):
+        self.router = router
+        self.target = target
+        self.levels = SLO_LEVELS if levels is None else levels
+        self.recovery_ratio = recovery_ratio
+        self.enabled = enabled
+        self.level = 0  # 0 runs the routed settings, n applies levels[n - 1]
+        self.latencies = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def route(self, phase):
+        """Return the model and options for a phase with the current degradation applied"""
+        model, options = self.router.route(phase)
+        with self.lock:
+            level = self.level
+        if not self.enabled or level == 0:
+            return model, options
+
+        adjustment = self.levels[level - 1]
+        if adjustment.get("model"):
+            model = self.router.available(adjustment["model"])
+        for key in ("num_ctx", "num_predict"):
+            if key in adjustment:
+                # Only ever lower a limit the phase already sets
+                options[key] = min(options.get(key, adjustment[key]), adjustment[key])
+        return model, options
+
+    def record(self, phase, seconds):
+        """Add the latency of a finished generation and adjust the level if needed"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.latencies.append(seconds)
+            if len(self.latencies) < self.latencies.maxlen:
+                return
+            average = sum(self.latencies) / len(self.latencies)
+            if average > self.target and self.level < len(self.levels):
+                self._set_level(self.level + 1, average, phase)
+            elif average < self.target * self.recovery_ratio and self.level > 0:
+                self._set_level(self.level - 1, average, phase)
+
+    def _set_level(self, level, average, phase):
+        direction = "Degrading" if level > self.level else "Restoring"
+        settings = self.levels[level - 1] if level else "routed settings"
+        logger.warning(
+            "%s generation settings to level %d/%d (%s): average latency %.1fs against a %.1fs target, last turn %s",
+            direction, level, len(self.levels), settings, average, self.target, phase,
+        )
+        self.level = level
+        # Measure the new settings from scratch
+        self.latencies.clear()
+
+    def skip_models(self, models):
+        """Send the phases and levels using these models to the main model instead"""
+        self.router.unavailable |= set(models)
+
+    def models(self):
+        """Return every model requests can be sent to, including fallbacks"""
+        models = self.router.models()
+        if self.enabled:
+            models |= {level["model"] for level in self.levels if level.get("model")}
+        return models
@@ -0,0 +1,119 @@
+"""Fast startup: a single server check that runs while the game is being set up.
+
+Preflight asks every Ollama server in OLLAMA_API_URLS for its models at once, in a
+background thread, and checks that every model the game phases use is installed. Only
+a missing main model stops the game; a missing phase or fallback model is a warning, and
+the front ends send its phases to the main model instead. The game is built while the
+check runs, and only needs its result before the first generation. requests is imported in that thread too, since it is the slowest import of
+the game; the other modules import it when they first send a request.
+
+StartupTimer records how long each startup step took, counted from when this module
+was first imported, so the front ends import it before anything else.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import *
+
+STARTED = time.perf_counter()
+
+class StartupTimer:
+    def __init__(self, started=STARTED):
+        self.started = started
+        self.last = started
+        self.steps = []  # (step, seconds) in order
+
+    def mark(self, step):
+        """Record the time since the previous mark as one step"""
+        now = time.perf_counter()
+        self.steps.append((step, now - self.last))
+        self.last = now
+
+    def report(self, preflight=None):
+        steps = ", ".join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in self.steps)
+        line = f"Startup: {steps}; ready after {(self.last - self.started) * 1000:.0f}ms"
+        if preflight is not None and preflight.duration is not None:
+            line += f" (server check {preflight.duration * 1000:.0f}ms, alongside setup)"
+        return line
+
+class Preflight:
+    def __init__(self, models, urls=None, timeout=PREFLIGHT_TIMEOUT, main_model=MODEL_NAME):
+        self.models = sorted(models)
+        self.main_model = main_model
+        self.base_urls = [url.rsplit("/api/", 1)[0] for url in (urls or OLLAMA_API_URLS)]
+        self.timeout = timeout
+        self.problems = None  # [(level, text)] once the check is done, empty if all is well
+        self.missing = set()  # Models other than the main one that some server doesn't have
+        self.duration = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def done(self):
+        return self.problems is not None
+
+    def wait(self):
+        """Block until the check is done and return its problems"""
+        self.thread.join()
+        return self.problems
+
+    def failed(self):
+        """Whether the game can't be played, as opposed to only some servers being down"""
+        return any(level == "error" for level, _ in self.problems)
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            problems = self.check()
+        except Exception as e:
+            problems = [("error", f"Could not check available models: {str(e)}")]
+        self.duration = time.perf_counter() - started
+        self.problems = problems  # Last, as it marks the check as done
+
+    def check(self):
+        """Probe every server at once; return a list of (level, text) problems
+
+        level is "error", "warning" for a server that is down while others are up (its
+        participants fail over to them), or "hint".
+        """
+        import requests  # Here, so the slow import happens in this thread too
+        with ThreadPoolExecutor(max_workers=len(self.base_urls)) as executor:
+            results = list(executor.map(self.check_endpoint, self.base_urls))
+
+        unreachable = [url for url, (reachable, _, _) in zip(self.base_urls, results) if not reachable]
+        if len(unreachable) == len(self.base_urls):
+            return [("error", f"Could not connect to Ollama API. Make sure Ollama is running on {', '.join(unreachable)}")]
+        problems = [("warning", f"Could not connect to Ollama API on {url}; its participants will use the other servers")
+                    for url in unreachable]
+        for _, endpoint_problems, missing in results:
+            problems += endpoint_problems
+            self.missing |= missing
+        for model_name in sorted(self.missing):
+            problems.append(("warning", f"Model '{model_name}' is not installed; {self.main_model} is used instead. "
+                                        f"Install it with: ollama pull {model_name}"))
+        return problems
+
+    def check_endpoint(self, base_url):
+        """Return (reachable, problems, missing models other than the main one) for one server"""
+        import requests
+        where = f" on {base_url}" if len(self.base_urls) > 1 else ""
+        try:
+            response = requests.get(base_url + "/api/tags", timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return False, [], set()
+        if response.status_code != 200:
+            return True, [("error", f"Ollama API{where} is not responding. Make sure Ollama is running.")], set()
+
+        model_names = [model.get("name", "").lower() for model in response.json().get("models", [])]
+        missing = {model_name for model_name in self.models
+                   if model_name.lower() not in model_names and model_name.split(':')[0].lower() not in model_names}
+        if self.main_model in missing:
+            return True, [
+                ("error", f"Model '{self.main_model}' not found in Ollama{where}."),
+                ("hint", f"Available models: {', '.join(model_names)}"),
+                ("hint", f"Please install the model with: ollama pull {self.main_model}"),
+            ], missing - {self.main_model}
+        return True, [], missing
@@ -0,0 +1,135 @@
+"""Local, incremental scoring of how human each participant seems.
+
+Every message updates running totals for its author: length, reply latency,
+punctuation, typo-like slips and informal markers. At vote time these become a short
+per-participant summary, including how far each participant's style is from the
+voter's own messages, which stand in for the model's style, or from the average of
+everyone else if the voter hasn't spoken. The summary replaces the raw transcript in
+vote prompts, so they stay small however long the game ran, and the scores end up in
+the game results for analysis.
+"""
+import math
+import re
+import string
+
+from config import *
+
+TYPO_PATTERNS = [
+    re.compile(r"(?:^|[.!?]\s+)[a-z]"),  # Sentence starting in lower case
+    re.compile(r"\bi\b"),  # Lower case "i"
+    re.compile(r"  +|\s[,.!?]"),  # Double spaces, space before punctuation
+    re.compile(r"([a-zA-Z])\1\1"),  # Stretched letters like "sooo"
+]
+INFORMAL_PATTERN = re.compile(r"\b(lol|haha\w*|lmao|omg|btw|idk|tbh|u|ur|gonna|wanna|nah|yeah)\b|[:;]-?[)(DP]|[\U0001F300-\U0001FAFF]",
+                              re.IGNORECASE)
+PUNCTUATION = set(string.punctuation)
+
+class ParticipantFeatures:
+    __slots__ = ("messages", "chars", "words", "word_chars", "punctuation", "typos", "informal",
+                 "questions", "latency", "latency_count", "last_text")
+
+    def __init__(self):
+        self.messages = 0
+        self.chars = 0
+        self.words = 0
+        self.word_chars = 0
+        self.punctuation = 0
+        self.typos = 0
+        self.informal = 0
+        self.questions = 0
+        self.latency = 0.0
+        self.latency_count = 0
+        self.last_text = ""
+
+    def update(self, text, latency=None):
+        words = text.split()
+        self.messages += 1
+        self.chars += len(text)
+        self.words += len(words)
+        self.word_chars += sum(len(word) for word in words)
+        self.punctuation += sum(1 for char in text if char in PUNCTUATION)
+        self.typos += sum(len(pattern.findall(text)) for pattern in TYPO_PATTERNS) + (not text.rstrip().endswith((".", "!", "?")))
+        self.informal += len(INFORMAL_PATTERN.findall(text))
+        self.questions += "?" in text
+        if latency is not None:
+            self.latency += latency
+            self.latency_count += 1
+        self.last_text = text
+
+    def per_message(self, total):
+        return total / self.messages if self.messages else 0.0
+
+    @property
+    def average_latency(self):
+        return self.latency / self.latency_count if self.latency_count else None
+
+    def style(self):
+        """Style as a few numbers of similar scale"""
+        return (
+            self.per_message(self.chars) / 100,
+            self.punctuation / self.chars * 10 if self.chars else 0.0,
+            self.per_message(self.typos),
+            self.per_message(self.informal),
+            self.per_message(self.questions),
+            self.word_chars / self.words / 5 if self.words else 0.0,
+        )
+
+class SuspicionScorer:
+    def __init__(self):
+        self.features = {}  # Participant id -> ParticipantFeatures
+
+    def update(self, participant, text, latency=None):
+        """Account for a new message; latency is the time since the previous message"""
+        features = self.features.get(participant.id)
+        if features is None:
+            features = self.features[participant.id] = ParticipantFeatures()
+        features.update(text, latency)
+
+    def reference_style(self, voter=None, participants=()):
+        """The voter's own style, or the average style of everyone else if the voter hasn't spoken"""
+        if voter is not None and voter.id in self.features:
+            return self.features[voter.id].style()
+        styles = [self.features[p.id].style() for p in participants
+                  if p.id in self.features and (voter is None or p.id != voter.id)]
+        if not styles:
+            return None
+        return tuple(sum(values) / len(styles) for values in zip(*styles))
+
+    def scores(self, participants, voter=None):
+        """Return {participant id: (style distance, suspicion between 0 and 1)} for everyone but the voter"""
+        reference = self.reference_style(voter, participants)
+        candidates = [p for p in participants if p.id in self.features and (voter is None or p.id != voter.id)]
+        distances = {p.id: math.dist(self.features[p.id].style(), reference) if reference else 0.0 for p in candidates}
+        furthest = max(distances.values(), default=0.0) or 1.0
+        scores = {}
+        for participant in candidates:
+            features = self.features[participant.id]
+            suspicion = (0.5 * distances[participant.id] / furthest
+                         + 0.25 * min(1.0, features.per_message(features.typos))
+                         + 0.25 * min(1.0, features.per_message(features.informal)))
+            scores[participant.id] = (distances[participant.id], suspicion)
+        return scores
+
+    def summary(self, participants, voter, limit=None):
+        """Return one line per other participant, most suspicious first, for a vote prompt
+
+        With a limit only that many are listed and the rest share one line, so the
+        prompt stays the same size however large the room is.
+        """
+        scores = self.scores(participants, voter)
+        ranked = [p for p in sorted(participants, key=lambda p: -scores.get(p.id, (0, 0))[1]) if p.id in scores]
+        lines = []
+        for participant in ranked[:limit]:
+            features = self.features[participant.id]
+            distance, suspicion = scores[participant.id]
+            latency = features.average_latency
+            quote = features.last_text[:SUSPICION_QUOTE_CHARS] + ("..." if len(features.last_text) > SUSPICION_QUOTE_CHARS else "")
+            lines.append(
+                f"- {participant.name}: {features.messages} messages, avg {features.per_message(features.chars):.0f} chars"
+                + (f", replies after {latency:.1f}s" if latency is not None else "")
+                + f", slips {features.per_message(features.typos):.1f}/msg, informal {features.per_message(features.informal):.1f}/msg"
+                + f", style distance from you {distance:.2f}, suspicion {suspicion:.2f}. Latest: \"{quote}\""
+            )
+        if limit is not None and len(ranked) > limit:
+            lines.append(f"- {len(ranked) - limit} others, unremarkable")
+        return "\n".join(lines)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Run many headless self-play games across a process pool and aggregate the outcomes.
+
+Every combination of model, number of AI participants, personality set and prompt
+variant is played a number of times. Finished games are appended to a JSON lines
+file as they come in, so an interrupted tournament picks up where it left off.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from colorama import Fore, Style, init
+
+from config import *
+from reverse_turing_test import ReverseGame
+
+# Initialize colorama
+init()
+
+# Personality sets that can be assigned to the AI participants
+PERSONALITY_SETS = {
+    "none": [],
+    "mixed": PERSONALITY_TRAITS,
+}
+
+# Shared cap on requests to the inference server, set in each worker process
+_request_limiter = None
+
+def _init_worker(request_limiter):
+    global _request_limiter
+    _request_limiter = request_limiter
+
+def config_key(config):
+    """Return a stable string identifying a tournament configuration"""
+    return f"{config['model']}|{config['ai_participants']}|{config['personality']}|{config['prompt_variant']}"
+
+def build_jobs(args):
+    """Expand the configuration grid into one job per game"""
+    jobs = []
+    grid = itertools.product(args.models, args.ai_participants, args.personalities, args.prompt_variants)
+    for model, ai_participants, personality, prompt_variant in grid:
+        config = {
+            "model": model,
+            "ai_participants": ai_participants,
+            "personality": personality,
+            "prompt_variant": prompt_variant,
+        }
+        key = config_key(config)
+        for game_index in range(args.games):
+            jobs.append({
+                "key": key,
+                "game_index": game_index,
+                "seed": zlib.crc32(f"{key}#{game_index}".encode("utf-8")),
+                "config": config,
+                "max_turns": args.max_turns,
+                "chat_duration_minutes": args.duration,
+                "phase_routing": args.phase_routing,
+            })
+    return jobs
+
+def play_game(job):
+    """Play a single headless game in a worker process"""
+    config = job["config"]
+    started = time.time()
+    try:
+        game = ReverseGame(
+            headless=True,
+            model_name=config["model"],
+            num_ai_participants=config["ai_participants"],
+            personality_traits=PERSONALITY_SETS[config["personality"]],
+            prompt_variant=config["prompt_variant"],
+            chat_duration_minutes=job["chat_duration_minutes"],
+            max_turns=job["max_turns"],
+            request_limiter=_request_limiter,
+            seed=job["seed"],
+            phase_models=None if job["phase_routing"] else {},
+            adaptive_latency=False,  # Keep the evaluated settings fixed for the whole game
+        )
+        results = game.run_game()
+    except Exception as e:
+        return {"key": job["key"], "game_index": job["game_index"], "config": config, "error": str(e)}
+
+    return {
+        "key": job["key"],
+        "game_index": job["game_index"],
+        "config": config,
+        "duration": round(time.time() - started, 2),
+        "results": results,
+    }
+
+def load_results(path):
+    """Read the games recorded so far, one record per game, skipping a partially written last line
+
+    A resumed run plays errored games again, so a game can have several records: a
+    finished one wins over errors, and of several errors the last one is kept.
+    """
+    records = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            game = (record["key"], record["game_index"])
+            if "error" in record and game in records and "error" not in records[game]:
+                continue
+            records[game] = record
+    return list(records.values())
+
+def aggregate(records):
+    """Compute outcome statistics per configuration"""
+    summary = {}
+    for record in records:
+        stats = summary.setdefault(record["key"], {
+            "games": 0, "errors": 0, "detected": 0, "suspected": 0, "ties": 0,
+            "human_ballots": 0, "ai_ballots": 0,
+        })
+        if "error" in record:
+            stats["errors"] += 1
+            continue
+        results = record["results"]
+        stats["games"] += 1
+        stats["detected"] += results["detected"]
+        stats["suspected"] += results["suspected"]
+        stats["ties"] += results["tie"]
+
+        # Share of the AI ballots that pointed at the human
+        for ballot in results["ballots"]:
+            if ballot["voter"] == results["human"]:
+                continue
+            stats["ai_ballots"] += 1
+            stats["human_ballots"] += ballot["voted"] == results["human"]
+
+    for stats in summary.values():
+        games = stats["games"] or 1
+        stats["detection_rate"] = stats["detected"] / games
+        stats["suspicion_rate"] = stats["suspected"] / games
+        stats["tie_rate"] = stats["ties"] / games
+        stats["human_vote_share"] = stats["human_ballots"] / (stats["ai_ballots"] or 1)
+    return summary
+
+def print_summary(summary):
+    print(f"\n{Fore.CYAN}=== TOURNAMENT RESULTS ==={Style.RESET_ALL}")
+    print(f"{'configuration':<50} {'games':>6} {'errors':>6} {'detected':>9} {'suspected':>10} {'ties':>6} {'votes on human':>15}")
+    for key in sorted(summary):
+        stats = summary[key]
+        print(
+            f"{key:<50} {stats['games']:>6} {stats['errors']:>6} {stats['detection_rate']:>9.1%} "
+            f"{stats['suspicion_rate']:>10.1%} {stats['tie_rate']:>6.1%} {stats['human_vote_share']:>15.1%}"
+        )
+
+def run_tournament(args):
+    records = {(r["key"], r["game_index"]): r for r in load_results(args.results)}
+    done = {game for game, record in records.items() if "error" not in record}
+    jobs = [job for job in build_jobs(args) if (job["key"], job["game_index"]) not in done]
+
+    print(f"{Fore.CYAN}{len(done)} games already recorded in {args.results}, {len(jobs)} to play.{Style.RESET_ALL}")
+    if not jobs:
+        return list(records.values())
+
+    # A manager-backed semaphore is shared by all workers, so the cap holds across processes
+    with multiprocessing.Manager() as manager:
+        request_limiter = manager.BoundedSemaphore(args.max_requests)
+        executor = ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(request_limiter,),
+        )
+        try:
+            futures = [executor.submit(play_game, job) for job in jobs]
+            with open(args.results, "a", encoding="utf-8") as f:
+                for finished, future in enumerate(as_completed(futures), 1):
+                    record = future.result()
+                    f.write(json.dumps(record) + "\n")
+                    f.flush()
+                    # Replaces the error of an earlier run, so the summary matches --summary-only
+                    records[(record["key"], record["game_index"])] = record
+
+                    if "error" in record:
+                        print(f"{Fore.RED}[{finished}/{len(jobs)}] {record['key']} #{record['game_index']}: {record['error']}{Style.RESET_ALL}")
+                    else:
+                        outcome = "detected" if record["results"]["detected"] else "not detected"
+                        print(f"[{finished}/{len(jobs)}] {record['key']} #{record['game_index']}: {outcome} ({record['duration']}s)")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    return list(records.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a tournament of headless Reverse Turing Test games.")
+    parser.add_argument("--models", nargs="+", default=TOURNAMENT_MODELS)
+    parser.add_argument("--ai-participants", nargs="+", type=int, default=TOURNAMENT_AI_PARTICIPANTS)
+    parser.add_argument("--personalities", nargs="+", choices=sorted(PERSONALITY_SETS), default=TOURNAMENT_PERSONALITY_SETS)
+    parser.add_argument("--prompt-variants", nargs="+", choices=sorted(PROMPT_VARIANTS), default=TOURNAMENT_PROMPT_VARIANTS)
+    parser.add_argument("--games", type=int, default=TOURNAMENT_GAMES_PER_CONFIG, help="games per configuration")
+    parser.add_argument("--max-turns", type=int, default=TOURNAMENT_MAX_TURNS)
+    parser.add_argument("--duration", type=float, default=CHAT_DURATION_MINUTES, help="chat duration in minutes")
+    parser.add_argument("--phase-routing", action="store_true",
+                        help="route phases to the models in PHASE_MODELS instead of using the evaluated model throughout")
+    parser.add_argument("--workers", type=int, default=TOURNAMENT_WORKERS)
+    parser.add_argument("--max-requests", type=int, default=TOURNAMENT_MAX_CONCURRENT_REQUESTS,
+                        help="maximum concurrent requests to the inference server across all workers")
+    parser.add_argument("--results", default=TOURNAMENT_RESULTS_FILE)
+    parser.add_argument("--summary-only", action="store_true", help="only aggregate the recorded results")
+    args = parser.parse_args()
+
+    if args.summary_only:
+        records = load_results(args.results)
+    else:
+        records = run_tournament(args)
+    print_summary(aggregate(records))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Tournament interrupted. Run it again to resume.{Style.RESET_ALL}")
@@ -0,0 +1,84 @@
+"""Structured game transcripts.
+
+Next to the human-readable text transcript, every game is saved as JSON so it can be
+loaded again for replays and analysis. load_transcript also reads the older text
+transcripts.
+"""
+import json
+import re
+from datetime import datetime
+
+CHAT_LINE = re.compile(r"^\[(?P<time>[^\]]*)\] (?P<sender>.+?) \((?P<role>HUMAN|AI)\): (?P<message>.*)$")
+PARTICIPANT_LINE = re.compile(r"^(?P<name>.+?) \((?P<role>HUMAN|AI)\)$")
+VOTE_LINE = re.compile(r"^(?P<name>.+?) \((?P<role>HUMAN|AI)\): (?P<votes>\d+) votes$")
+
+def save_json_transcript(filename, participants, chat_log, model, ballots=None, seed=None):
+    """Write the game to a JSON transcript"""
+    names = {p.id: p.name for p in participants}
+    transcript = {
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "model": model,
+        "human": next(p.name for p in participants if p.is_human),
+        "participants": [
+            {"name": p.name, "is_human": p.is_human, "votes": p.votes}
+            for p in participants
+        ],
+        "chat_history": [
+            {
+                "time": chat_log.format_time(entry.created),
+                "seconds": round(entry.created - chat_log.monotonic_start, 3),  # Since the game started
+                "sender": participants[entry.participant_index].name,
+                "message": entry.text,
+            }
+            for entry in chat_log
+        ],
+    }
+    if seed is not None:
+        transcript["seed"] = seed  # Plays the game again with the same names, seats and model seeds
+    if ballots is not None:
+        transcript["ballots"] = [{"voter": names[voter], "voted": names[voted]} for voter, voted in ballots]
+
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(transcript, f, indent=2)
+
+def load_transcript(filename):
+    """Load a JSON transcript, or parse a text transcript into the same structure"""
+    with open(filename, encoding="utf-8") as f:
+        if filename.endswith(".json"):
+            return json.load(f)
+        lines = f.read().splitlines()
+
+    transcript = {"date": None, "model": None, "human": None, "participants": [], "chat_history": []}
+    votes = {}
+    section = None
+    for line in lines:
+        if line.startswith("=== ") and line.endswith(" ==="):
+            section = line.strip("= ")
+            continue
+        if not line.strip():
+            continue
+        if line.startswith("Date: ") and section == "REVERSE TURING TEST GAME TRANSCRIPT":
+            transcript["date"] = line[len("Date: "):]
+        elif line.startswith("Human was ") and section == "REVERSE TURING TEST GAME TRANSCRIPT":
+            transcript["human"] = line[len("Human was "):]
+        elif line.startswith("Seed: ") and section == "REVERSE TURING TEST GAME TRANSCRIPT":
+            transcript["seed"] = int(line[len("Seed: "):])
+        elif section == "PARTICIPANTS":
+            match = PARTICIPANT_LINE.match(line)
+            if match:
+                transcript["participants"].append({"name": match["name"], "is_human": match["role"] == "HUMAN"})
+        elif section == "CHAT HISTORY":
+            match = CHAT_LINE.match(line)
+            if match:
+                transcript["chat_history"].append({"time": match["time"], "sender": match["sender"], "message": match["message"]})
+            elif transcript["chat_history"]:
+                # A message that contained a line break
+                transcript["chat_history"][-1]["message"] += "\n" + line
+        elif section == "VOTING RESULTS":
+            match = VOTE_LINE.match(line)
+            if match:
+                votes[match["name"]] = int(match["votes"])
+
+    for participant in transcript["participants"]:
+        participant["votes"] = votes.get(participant["name"], 0)
+    return transcript
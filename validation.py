@@ -0,0 +1,116 @@
+"""Checks on generated replies before they go into the chat history.
+
+Everything in the chat history ends up in later prompts, so a failed request or a reply
+in which the model also writes lines for other participants would be repeated to every
+AI for the rest of the game. A reply is repaired where possible: a leading "Name:" of
+the speaker is dropped, and anything from the first later line that starts with a
+participant's name or compact prompt tag is cut off. A first line starting with someone
+else's name addresses them and is kept. Long replies are cut at a sentence or word
+boundary. A reply that is empty after that is rejected; generate() then asks for it
+again, up to REPLY_RETRIES times, and uses one of the FALLBACK_REPLIES after that, so the
+turn still has a harmless message.
+"""
+import re
+from collections import Counter
+
+from config import *
+from ollama_client import GenerationCancelled, GenerationError
+
+class ReplyValidator:
+    def __init__(self, participants, max_length=MAX_AI_RESPONSE_LENGTH, speaker_tags=None):
+        self.participants = participants
+        self.max_length = max_length
+        self.speaker_tags = speaker_tags if speaker_tags is not None else {}  # Compact prompt tag -> names
+        self.stats = Counter()  # "repaired", "rejected" and "fallback" replies
+        self.fallbacks_used = {}  # Participant id -> fallbacks given, so they don't repeat
+        self.speaker_pattern = None  # Built on first use, once everyone has a name
+        self.pattern_tags = 0  # Number of speaker tags the pattern was built with
+
+    def speaker_line(self):
+        """Pattern for a line that starts with a participant's name or tag, like "**Alex:**" """
+        if self.speaker_pattern is None or self.pattern_tags != len(self.speaker_tags):
+            speakers = {p.name for p in self.participants} | set(self.speaker_tags)
+            names = sorted((re.escape(name) for name in speakers), key=len, reverse=True)
+            self.speaker_pattern = re.compile(r"^[ \t>*_\[]*(" + "|".join(names) + r")[*_\]]*[ \t]*:[*_]*[ \t]*",
+                                              re.IGNORECASE | re.MULTILINE)
+            self.pattern_tags = len(self.speaker_tags)
+        return self.speaker_pattern
+
+    def is_own(self, participant, speaker):
+        """Whether a speaker name or tag at the start of a line stands for the participant"""
+        speaker = speaker.lower()
+        return speaker == participant.name.lower() or any(
+            tag.lower() == speaker and participant.name in names for tag, names in self.speaker_tags.items())
+
+    def shorten(self, text):
+        """Cut a long reply at the last sentence end, or else at a word boundary"""
+        if len(text) <= self.max_length:
+            return text
+        cut = text[:self.max_length]
+        sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+        if sentence_end >= self.max_length // 2:
+            return cut[:sentence_end + 1]
+        space = cut.rfind(" ")
+        return (cut[:space] if space >= self.max_length // 2 else cut).rstrip(" ,;:") + "..."
+
+    def check(self, participant, text, phase="chat"):
+        """Return (repaired text, None), or (text, problem) if the reply can't be used"""
+        original = text
+        cut = False
+        text = text.strip().strip('"').strip()
+        if phase != "vote":
+            # Votes name other participants by design, so only chat is checked for lines spoken as them.
+            # A first line of "Name: ..." addresses someone else; the same on a later line speaks for them
+            pattern = self.speaker_line()
+            match = pattern.match(text)
+            if match and self.is_own(participant, match.group(1)):
+                text = text[match.end():]
+            first_line_end = text.find("\n")
+            match = pattern.search(text, first_line_end + 1) if first_line_end != -1 else None
+            if match:
+                text = text[:match.start()]
+                cut = True
+            text = text.strip().strip('"').strip()
+        if not text:
+            self.stats["rejected"] += 1
+            return original, "impersonation" if cut else "empty"
+        text = self.shorten(text)
+        if text != original:
+            self.stats["repaired"] += 1
+        return text, None
+
+    def fallback(self, participant, phase="chat"):
+        """A safe reply for when no generated one could be used"""
+        replies = FALLBACK_REPLIES.get(phase, FALLBACK_REPLIES["chat"])
+        used = self.fallbacks_used.get(participant.id, 0)
+        self.fallbacks_used[participant.id] = used + 1
+        self.stats["fallback"] += 1
+        return replies[used % len(replies)].format(name=participant.name)
+
+    def generate(self, agent, phase, request, log=print):
+        """Return a usable reply for an agent, or None if the generation was cancelled
+
+        request(attempt) sends one generation request and returns its text. Failed
+        requests and replies that can't be repaired are asked for again up to
+        REPLY_RETRIES times and then replaced by a fallback.
+        """
+        participant = agent.participant
+        for attempt in range(REPLY_RETRIES + 1):
+            try:
+                message = request(attempt)
+            except GenerationCancelled:
+                agent.cancelled += 1
+                return None
+            except GenerationError as e:
+                agent.errors += 1
+                problem = f"error {e.status_code}"
+            except Exception as e:
+                agent.errors += 1
+                problem = f"error: {str(e)}"
+            else:
+                message, problem = self.check(participant, message, phase)
+                if problem is None:
+                    return message
+            if DEBUG_MODE:
+                log(f"DEBUG: Rejected reply from {participant.name} ({problem})")
+        return self.fallback(participant, phase)
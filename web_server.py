@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""Python server for the web front-end in web-game/public.
+
+It uses the same Socket.IO protocol as web-game/src/server.js, but the game runs on
+the Python engine: the game flow shared with the window version (game_flow.py), agents,
+model routing, the latency controller, pacing and retrieval. Every room is a set of
+asyncio tasks. Generations run in a shared thread
+pool, so one process can host many concurrent games.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import socketio
+from aiohttp import web
+
+from config import *
+from pacing import Pacer
+from ollama_client import OllamaClient, CancelToken
+from chat_log import ChatLog
+from transcripts import save_json_transcript
+from retrieval import EmbeddingClient, HistoryIndex
+from model_routing import ModelRouter
+from slo import LatencyController
+from rooms import is_large_room, participant_names, SpeakerSelector
+from scheduler import TurnScheduler, Turn
+from validation import ReplyValidator
+from game_flow import GameFlow, vote_message
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web-game", "public")
+SOCKET_IO_CLIENT = os.path.join(os.path.dirname(STATIC_DIR), "node_modules", "socket.io", "client-dist", "socket.io.min.js")
+SOCKET_IO_CDN = "https://cdn.socket.io/4.7.2/socket.io.min.js"
+
+class WebParticipant:
+    __slots__ = ("id", "sid", "is_human", "messages", "votes", "personality", "name")
+
+    def __init__(self, id, sid=None, is_human=False):
+        self.id = id
+        self.sid = sid
+        self.is_human = is_human
+        self.messages = []
+        self.votes = 0
+        self.personality = None
+        self.name = None
+
+class WebGame(GameFlow):
+    """One room: the game state plus the tasks that drive it
+
+    The game steps come from GameFlow and run in the server's thread pool; the room
+    only sends their results to the browser and schedules what comes next.
+    """
+    def __init__(self, server, game_id):
+        self.server = server
+        self.game_id = game_id
+        self.participants = []
+        self.agents = {}
+        self.human_participant = None
+        self.chat_history = ChatLog()
+        self.history_index = HistoryIndex(server.embedder)
+        self.ballots = []
+        self.game_over = False
+        self.voting_phase = False
+        self.waiting_for_human = False
+        self.turn_counter = 0
+        self.start_time = None
+        self.pacer = Pacer()
+        self.router = LatencyController(ModelRouter(), enabled=SLO_ENABLED)
+        self.client = server.client
+        self.rng = server.rng
+        self.chat_token = None
+        self.vote_token = CancelToken()
+        self.tasks = set()
+        self.human_voted = False
+        self.ai_votes = 0
+        self.speakers = None  # Picks the speakers of each round in large rooms
+        self.scheduler = None
+        self.validator = None  # Keeps failed and malformed replies out of the chat
+        self.results_sent = False
+
+    def spawn(self, coroutine, delay=0):
+        """Run a step of the game in the background, optionally after a delay"""
+        async def run():
+            if delay:
+                await asyncio.sleep(delay)
+            await coroutine
+        task = asyncio.ensure_future(run())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def emit(self, event, data=None):
+        await self.server.sio.emit(event, data, room=self.game_id)
+
+    async def system_message(self, content):
+        await self.emit("message", {"sender": "System", "content": content, "isSystem": True})
+
+    def setup_game(self, human_sid):
+        rng = self.server.rng
+        total = NUM_AI_PARTICIPANTS + 1
+        human_id = rng.randint(1, total)
+        names = participant_names(total, rng)
+        for i in range(1, total + 1):
+            is_human = i == human_id
+            participant = WebParticipant(i, human_sid if is_human else None, is_human)
+            participant.name = names[i - 1]
+            if not is_human:
+                participant.personality = PERSONALITY_TRAITS[(i - 1) % len(PERSONALITY_TRAITS)]
+            self.participants.append(participant)
+            if is_human:
+                self.human_participant = participant
+        if is_large_room(total):
+            self.speakers = SpeakerSelector(self.participants, rng=rng)
+        self.scheduler = TurnScheduler(self.participants, self.chat_history, speakers=self.speakers, rng=rng)
+        self.validator = ReplyValidator(self.participants)
+
+        self.create_agents()
+
+    async def start(self, human_sid):
+        self.setup_game(human_sid)
+        await self.server.sio.emit("gameStarted", {
+            "participants": [{"id": p.id, "name": p.name, "isHuman": p.is_human} for p in self.participants],
+            "humanParticipant": {"id": self.human_participant.id, "name": self.human_participant.name},
+        }, to=human_sid)
+
+        self.start_time = time.time()
+        self.chat_token = CancelToken(deadline=self.start_time + CHAT_DURATION_MINUTES * 60)
+
+        await self.system_message("Welcome to the Reverse Turing Test Game! Try to convince the AI models that you're also an AI.")
+        participant_list = ", ".join(f"{p.name}{' (YOU)' if p.is_human else ''}" for p in self.participants)
+        await self.system_message(f"Participants: {participant_list}")
+        await self.system_message(f"{self.human_participant.name}, please introduce yourself to the group.")
+
+        self.waiting_for_human = True
+        await self.emit("waitingForHuman")
+        self.spawn(self.run_timer())
+
+    async def record_message(self, participant, message):
+        index = self.add_to_history(participant, message)
+        if RETRIEVAL_ENABLED:
+            # Embedding can mean a blocking request, which must not hold up the other rooms or wait for a generation slot
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.server.embed_executor, self.history_index.add, index, message)
+
+    async def add_ai_message(self, participant, message):
+        if self.game_over:
+            return
+        await self.emit("message", {"sender": participant.name, "content": message, "isHuman": False})
+        await self.record_message(participant, message)
+
+    async def in_pool(self, function, *args):
+        """Run a blocking game step in the server's thread pool, holding a request slot"""
+        loop = asyncio.get_running_loop()
+        async with self.server.request_slots:
+            return await loop.run_in_executor(self.server.executor, function, *args)
+
+    async def handle_human_message(self, message):
+        if self.game_over or not self.waiting_for_human:
+            return
+        self.waiting_for_human = False
+        await self.emit("message", {"sender": self.human_participant.name, "content": message, "isHuman": True})
+        await self.record_message(self.human_participant, message)
+
+        if self.turn_counter == 0:
+            self.spawn(self.run_ai_introductions(), delay=1)
+        else:
+            self.spawn(self.continue_discussion(), delay=1)
+
+    async def run_ai_introductions(self):
+        for participant in self.participants:
+            if participant.is_human or self.game_over:
+                continue
+            generated = await self.in_pool(self.generate_turn, Turn(participant, "intro"))
+            if generated is None:
+                return
+            message, delay = generated
+            await self.add_ai_message(participant, message)
+            await asyncio.sleep(delay)
+
+        if not self.game_over:
+            await self.system_message("Let's begin the main discussion. Remember to keep your responses concise!")
+            await self.continue_discussion()
+
+    async def continue_discussion(self):
+        if self.game_over:
+            return
+        await self.play_turn(self.next_turn())
+
+    async def play_turn(self, turn):
+        if self.game_over:
+            return
+        if turn.speaker.is_human:
+            self.waiting_for_human = True
+            await self.emit("waitingForHuman")
+            if turn.phase == "answer":
+                await self.system_message(f"{turn.speaker.name}, please respond to the question.")
+            else:
+                await self.system_message(f"{turn.speaker.name}, it's your turn to respond.")
+            return
+
+        generated = await self.in_pool(self.generate_turn, turn)
+        if generated is None:
+            return
+        message, delay = generated
+        await self.add_ai_message(turn.speaker, message)
+        follow_up = self.follow_up(turn)
+        if follow_up is None:
+            self.spawn(self.continue_discussion(), delay=delay)
+        else:
+            self.spawn(self.play_turn(follow_up), delay=0.5 if follow_up.speaker.is_human else delay)
+
+    async def run_timer(self):
+        while not self.game_over:
+            remaining = CHAT_DURATION_MINUTES * 60 - (time.time() - self.start_time)
+            if remaining <= 0:
+                await self.end_game()
+                return
+            await self.emit("timerUpdate", {"minutes": int(remaining // 60), "seconds": int(remaining % 60)})
+            await asyncio.sleep(1)
+
+    async def end_game(self):
+        voters = self.close_chat()
+        self.voting_phase = True
+        self.waiting_for_human = False
+
+        await self.system_message("=== VOTING PHASE ===")
+        await self.system_message("Each participant will now vote on who they think is the human.")
+
+        for participant in voters:
+            self.spawn(self.handle_ai_vote(participant))
+
+        await self.emit("showVoting", {
+            "participants": [{"id": p.id, "name": p.name} for p in self.participants if not p.is_human]
+        })
+
+    async def handle_ai_vote(self, voting_participant):
+        vote = await self.in_pool(self.cast_vote, voting_participant)
+        if vote is None:
+            return
+        await self.emit("message", {"sender": voting_participant.name, "content": vote_message(*vote), "isHuman": False})
+        self.ai_votes += 1
+        await self.maybe_show_results()
+
+    async def handle_human_vote(self, voted_participant_id):
+        if not self.voting_phase or self.human_voted:
+            return
+        voted_participant = next((p for p in self.participants if p.id == voted_participant_id), None)
+        if voted_participant is None:
+            return
+        voted_participant.votes += 1
+        self.ballots.append((self.human_participant.id, voted_participant.id))
+        self.human_voted = True
+        await self.maybe_show_results()
+
+    async def maybe_show_results(self):
+        """Send the results once the human and every AI have voted"""
+        if self.results_sent or not self.human_voted or self.ai_votes < len(self.agents):
+            return
+        self.results_sent = True
+
+        sorted_participants, result_message = self.results()
+        await self.emit("gameResults", {
+            "voteTally": [{"id": p.id, "name": p.name, "votes": p.votes, "isHuman": p.is_human} for p in sorted_participants],
+            "resultMessage": result_message,
+        })
+        self.save_transcript()
+
+    def save_transcript(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"game_transcript_{timestamp}_{self.game_id[:8]}.json"
+        save_json_transcript(filename, self.participants, self.chat_history, MODEL_NAME, self.ballots)
+        print(f"Game {self.game_id}: transcript saved to {filename}")
+
+    def shutdown(self):
+        """Stop the room: abort generations and cancel its tasks"""
+        super().shutdown()
+        for task in list(self.tasks):
+            task.cancel()
+
+class GameServer:
+    def __init__(self, max_concurrent_requests=WEB_MAX_CONCURRENT_REQUESTS):
+        self.rng = random.Random()
+        self.sio = socketio.AsyncServer(async_mode="aiohttp")
+        self.games = {}
+        self.sessions = {}  # Socket id -> game id
+        self.client = OllamaClient()
+        self.embedder = EmbeddingClient()  # Shared, so the embeddings endpoint is only probed once
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_requests)
+        self.embed_executor = ThreadPoolExecutor(max_workers=WEB_EMBEDDING_WORKERS)  # Apart, so embeddings never queue behind generations
+        self.request_slots = asyncio.Semaphore(max_concurrent_requests)
+
+        self.sio.on("connect", self.on_connect)
+        self.sio.on("createGame", self.on_create_game)
+        self.sio.on("startGame", self.on_start_game)
+        self.sio.on("sendMessage", self.on_send_message)
+        self.sio.on("vote", self.on_vote)
+        self.sio.on("disconnect", self.on_disconnect)
+
+    async def game_for(self, sid):
+        game = self.games.get(self.sessions.get(sid))
+        if game is None:
+            await self.sio.emit("error", {"message": "Game not found"}, to=sid)
+        return game
+
+    async def on_connect(self, sid, environ):
+        print(f"New client connected: {sid}")
+
+    async def on_create_game(self, sid, data=None):
+        game_id = uuid.uuid4().hex
+        self.games[game_id] = WebGame(self, game_id)
+        self.sessions[sid] = game_id
+        await self.sio.enter_room(sid, game_id)
+        await self.sio.emit("gameCreated", {"gameId": game_id}, to=sid)
+        print(f"Game created: {game_id} ({len(self.games)} active)")
+
+    async def on_start_game(self, sid, data=None):
+        game = await self.game_for(sid)
+        if game is not None and game.start_time is None:
+            await game.start(sid)
+
+    async def on_send_message(self, sid, message):
+        game = await self.game_for(sid)
+        if game is not None and isinstance(message, str) and message.strip():
+            await game.handle_human_message(message.strip())
+
+    async def on_vote(self, sid, voted_participant_id):
+        game = await self.game_for(sid)
+        if game is not None:
+            await game.handle_human_vote(voted_participant_id)
+
+    async def on_disconnect(self, sid, reason=None):
+        print(f"Client disconnected: {sid}")
+        game_id = self.sessions.pop(sid, None)
+        game = self.games.get(game_id)
+        if game is not None and (game.human_participant is None or game.human_participant.sid == sid):
+            game.shutdown()
+            del self.games[game_id]
+            print(f"Game {game_id} deleted due to human player disconnection")
+
+    async def socket_io_client(self, request):
+        """Serve the Socket.IO client the page loads, from node_modules or the CDN"""
+        if os.path.exists(SOCKET_IO_CLIENT):
+            return web.FileResponse(SOCKET_IO_CLIENT)
+        raise web.HTTPFound(SOCKET_IO_CDN)
+
+    async def index(self, request):
+        return web.FileResponse(os.path.join(STATIC_DIR, "index.html"))
+
+    def app(self):
+        app = web.Application()
+        self.sio.attach(app)
+        app.router.add_get("/socket.io/socket.io.js", self.socket_io_client)
+        app.router.add_get("/", self.index)
+        app.router.add_static("/", STATIC_DIR)
+        return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the web version of the Reverse Turing Test on the Python engine.")
+    parser.add_argument("--host", default=WEB_HOST)
+    parser.add_argument("--port", type=int, default=WEB_PORT)
+    parser.add_argument("--max-requests", type=int, default=WEB_MAX_CONCURRENT_REQUESTS,
+                        help="maximum concurrent requests to the inference server across all rooms")
+    args = parser.parse_args()
+
+    async def make_app():
+        return GameServer(args.max_requests).app()
+
+    web.run_app(make_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()